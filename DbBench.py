@@ -0,0 +1,393 @@
+#IMPORT
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import namedtuple
+from contextlib import contextmanager
+
+#pyodbc stand-in - swapped into DbSearch only while a benchmark runs (see bench_driver)
+try:
+    import pyodbc
+    _HAVE_PYODBC = True
+except ImportError:
+    _HAVE_PYODBC = False
+
+
+#-----------------------------------------------------------------------------------------------------------------------
+#In-process ODBC stand-in (SQLite)
+#-----------------------------------------------------------------------------------------------------------------------
+class RoundTrips():
+    '''
+    RoundTrips - thread-safe count of statements / catalog calls sent to the stand-in (one per simulated network round trip)
+    '''
+
+    def __init__(self):
+        self.count : int = 0                                #count
+        self.__lock = threading.Lock()                      #lock
+
+    def hit(self, latency):
+        with self.__lock:
+            self.count += 1
+        if latency:
+            #simulated network latency, sleeping releases the GIL like a real driver waiting on the server
+            time.sleep(latency)
+
+    def reset(self):
+        with self.__lock:
+            self.count = 0
+
+round_trips = RoundTrips()
+
+TableRow = namedtuple('TableRow', ['table_cat', 'table_schem', 'table_name', 'table_type', 'remarks'])
+ColumnRow = namedtuple('ColumnRow', ['table_cat', 'table_schem', 'table_name', 'column_name', 'data_type', 'type_name',
+                                     'column_size', 'buffer_length', 'decimal_digits', 'num_prec_radix', 'nullable'])
+
+class BenchOdbc():
+    '''
+    BenchOdbc - the slice of the pyodbc API DbSearcher uses, backed by a SQLite file
+        conn_string: Database=<sqlite path>;Schema=<db_name>  (the file is attached under the schema name, so db_name.table resolves)
+        -> latency (seconds) is added to every round trip
+    '''
+    Error = sqlite3.Error
+    OperationalError = sqlite3.OperationalError
+    latency = 0.0
+
+    #declared SQLite type -> (python type, ODBC type code, column size)
+    types = {'INTEGER': (int, 4, 10), 'REAL': (float, 8, 15), 'DECIMAL': (float, 3, 18), 'TEXT': (str, -9, 4000),
+             'VARCHAR': (str, 12, 255), 'DATE': (datetime.date, 91, 10), 'TIMESTAMP': (datetime.datetime, 93, 23)}
+
+    @classmethod
+    def connect(cls, conn_string, **kwargs):
+        parts = dict(part.split('=', 1) for part in conn_string.split(';') if '=' in part)
+        return BenchConnection(parts['Database'], parts.get('Schema', 'dbo'))
+
+class BenchConnection():
+    def __init__(self, path, schema):
+        if not os.path.exists(path):
+            raise BenchOdbc.OperationalError(f'unable to open database {path}')
+        self.raw = sqlite3.connect(':memory:', check_same_thread=False, detect_types=sqlite3.PARSE_DECLTYPES)
+        self.raw.execute(f"ATTACH DATABASE '{path}' AS {schema}")
+        self.schema : str = schema                          #schema
+        self.timeout : int = 0                              #timeout (accepted, not enforced)
+        self.autocommit : bool = False                      #autocommit
+
+    def add_output_converter(self, sqltype, func):
+        pass
+
+    def cursor(self):
+        return BenchCursor(self)
+
+    def commit(self):
+        self.raw.commit()
+
+    def close(self):
+        self.raw.close()
+
+class BenchCursor():
+    def __init__(self, cxn):
+        self.connection = cxn                               #connection
+        self.__raw = cxn.raw.cursor()                       #raw sqlite cursor
+        self.__first = []                                   #first row (read early to type the description)
+        self.description = None                            #description
+
+    def execute(self, sql, *params):
+        round_trips.hit(BenchOdbc.latency)
+        self.__raw.execute(sql, params)
+        self.__first = []
+        if self.__raw.description:
+            first = self.__raw.fetchone()
+            self.__first = [first] if first is not None else []
+            self.description = [(d[0], str if v is None else type(v), None, 255, 255, 0, True)
+                                for d, v in zip(self.__raw.description, first or [None] * len(self.__raw.description))]
+        else:
+            self.description = None
+        return self
+
+    def fetchone(self):
+        if self.__first:
+            return self.__first.pop()
+        return self.__raw.fetchone()
+
+    def fetchmany(self, size=1):
+        rows, self.__first = self.__first[:size], self.__first[size:]
+        if len(rows) < size:
+            rows += self.__raw.fetchmany(size - len(rows))
+        return rows
+
+    def fetchall(self):
+        rows, self.__first = self.__first, []
+        return rows + self.__raw.fetchall()
+
+    def fetchval(self):
+        row = self.fetchone()
+        return None if row is None else row[0]
+
+    def tables(self, table=None, catalog=None, schema=None, tableType=None):
+        round_trips.hit(BenchOdbc.latency)
+        schemaName = self.connection.schema
+        rows = self.connection.raw.execute(f"SELECT name, type FROM {schemaName}.sqlite_master WHERE type IN ('table', 'view') ORDER BY name").fetchall()
+        return iter([TableRow('main', schemaName, name, kind.upper(), None) for name, kind in rows])
+
+    def columns(self, table=None, catalog=None, schema=None, column=None):
+        round_trips.hit(BenchOdbc.latency)
+        schemaName = self.connection.schema
+        out = []
+        for (tableName,) in self.connection.raw.execute(f"SELECT name FROM {schemaName}.sqlite_master WHERE type = 'table' ORDER BY name").fetchall():
+            if table and tableName != table:
+                continue
+            for cid, name, declared, notnull, default, pk in self.connection.raw.execute(f'PRAGMA {schemaName}.table_info("{tableName}")').fetchall():
+                pyType, code, size = BenchOdbc.types.get((declared or 'TEXT').split('(')[0].upper(), (str, -9, 4000))
+                out.append(ColumnRow('main', schemaName, tableName, name, code, declared, size, size, 0, 10, not notnull))
+        return iter(out)
+
+    def commit(self):
+        self.connection.commit()
+
+    @property
+    def rowcount(self):
+        return self.__raw.rowcount
+
+    def close(self):
+        self.__raw.close()
+
+@contextmanager
+def bench_driver():
+    '''
+    with bench_driver() as DbSearch: ... -> DbSearch talks to the stand-in, its previous driver is restored on exit
+        -> when pyodbc can't be loaded at all (no unixODBC, etc.) the stand-in is registered as pyodbc for the import only
+    '''
+    registered = not _HAVE_PYODBC and 'pyodbc' not in sys.modules
+    if registered:
+        sys.modules['pyodbc'] = BenchOdbc
+    try:
+        import DbSearch
+        original = DbSearch.pyodbc
+        DbSearch.pyodbc = BenchOdbc
+        try:
+            yield DbSearch
+        finally:
+            DbSearch.pyodbc = original
+    finally:
+        if registered:
+            sys.modules.pop('pyodbc', None)
+
+
+#-----------------------------------------------------------------------------------------------------------------------
+#Synthetic schema
+#-----------------------------------------------------------------------------------------------------------------------
+def build_database(path, tables=20, columns=8, rows=2000, cardinality=100, types=('INTEGER', 'TEXT', 'REAL', 'DATE'), needle='Needle42', seed=1):
+    '''
+    writes a synthetic SQLite database for the benchmark
+        tables x columns x rows, each column drawing from cardinality distinct values of its type (types cycle across columns)
+        -> needle is planted in a few rows of the first TEXT column of every 5th table so Search has hits
+    '''
+    rng = random.Random(seed)
+    if os.path.exists(path):
+        os.remove(path)
+    cxn = sqlite3.connect(path)
+    for t in range(tables):
+        columnTypes = [types[c % len(types)] for c in range(columns)]
+        cxn.execute(f'CREATE TABLE bench_{t:03d} (' + ', '.join(f'col_{c:02d} {columnType}' for c, columnType in enumerate(columnTypes)) + ')')
+        pools = [_value_pool(rng, columnType, cardinality) for columnType in columnTypes]
+        data = [[rng.choice(pool) for pool in pools] for r in range(rows)]
+        if t % 5 == 0 and 'TEXT' in columnTypes:
+            for r in rng.sample(range(rows), min(3, rows)):
+                data[r][columnTypes.index('TEXT')] = needle
+        cxn.executemany(f'INSERT INTO bench_{t:03d} VALUES ({", ".join("?" * columns)})', data)
+    cxn.commit()
+    cxn.close()
+
+def _value_pool(rng, columnType, cardinality):
+    if columnType == 'INTEGER':
+        return rng.sample(range(cardinality * 10), cardinality)
+    if columnType in ('REAL', 'DECIMAL'):
+        return [round(rng.uniform(0, 10000), 2) for i in range(cardinality)]
+    if columnType == 'DATE':
+        return [str(datetime.date(2000, 1, 1) + datetime.timedelta(days=rng.randrange(9000))) for i in range(cardinality)]
+    return [''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for j in range(rng.randint(4, 12))) for i in range(cardinality)]
+
+
+#-----------------------------------------------------------------------------------------------------------------------
+#Scenarios
+#-----------------------------------------------------------------------------------------------------------------------
+#baseline = the current DbSearcher with its optimizations switched off (single cursor, COUNT(*) per table, no schema cache,
+#one query per column, untyped predicates) - not the pre-optimization code, so it measures what the flags buy
+BASELINE = {'max_workers': None, 'batch_search': False, 'typed_search': False, 'exact_count': True, 'schema_cache_ttl': 0}
+
+SCENARIOS = [
+    ['Table baseline', 'Table', BASELINE],
+    ['Table optimized', 'Table', {}],
+    ['Column baseline', 'Column', BASELINE],
+    ['Column optimized', 'Column', {}],
+    ['Search baseline', 'Search', BASELINE],
+    ['Search optimized', 'Search', {'max_workers': 4, 'batch_search': True}],
+    ['MST baseline', 'MST', BASELINE],
+    ['MST optimized', 'MST', {'max_workers': 4}],
+    ['MST sampled', 'MST', {'max_workers': 4, 'mst_sample': 10}],
+]
+
+def is_approximate(params):
+    '''
+    configurations whose output is allowed to differ from the baseline (sampled MST)
+    '''
+    return bool(params.get('mst_sample'))
+
+def output_key(out):
+    '''
+    order-insensitive form of a DbSearcher output for comparison, values compared as text so dtypes don't matter
+    '''
+    if not hasattr(out, 'itertuples'):
+        return out
+    return list(out.columns), sorted(tuple(row) for row in out.astype(str).itertuples(index=False))
+
+def run_scenario(path, search_type, params, search_val, repeat):
+    '''
+    runs one DbSearcher configuration repeat times, every run cold (schema cache cleared)
+        -> (measurements, output): wall time (median), round trips, output rows, then one extra run under tracemalloc for the peak memory
+    '''
+    import DbSearch
+    def once():
+        DbSearch.schema_cache.invalidate(f'Database={path};Schema=dbo', 'dbo')
+        dbs = DbSearch.DbSearcher(conn_string=f'Database={path};Schema=dbo', conn_type='OTH', db_name='dbo', search_type=search_type,
+                                  search_val=search_val if search_type == 'Search' else None, verbose=False, **params)
+        return dbs.search()
+
+    walls = []
+    for i in range(repeat):
+        round_trips.reset()
+        start = time.perf_counter()
+        out = once()
+        walls.append(time.perf_counter() - start)
+    trips = round_trips.count
+
+    tracemalloc.start()
+    try:
+        once()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {'wall': statistics.median(walls), 'round_trips': trips, 'peak_memory': peak, 'rows_out': 0 if out is None else len(out)}, out
+
+def run_bench(tables=20, columns=8, rows=2000, cardinality=100, types=('INTEGER', 'TEXT', 'REAL', 'DATE'), latency=0.001, repeat=3, scenarios=None):
+    '''
+    builds the synthetic database, runs every scenario -> results dict (meta + one entry per scenario)
+        -> SQLite has no row-count catalog, so catalog row counts fall back to COUNT(*) here (a few extra round trips for Table)
+        -> every exact scenario's output is checked against its search_type's baseline output (matches_baseline, None when not checked)
+    '''
+    BenchOdbc.latency = latency
+    path = os.path.join(tempfile.mkdtemp(prefix='dbbench_'), 'bench.db')
+    build_database(path, tables, columns, rows, cardinality, types)
+    results = []
+    expected = {}
+    try:
+        with bench_driver():
+            for name, search_type, params in scenarios or SCENARIOS:
+                measured, out = run_scenario(path, search_type, params, '%Needle42%', repeat)
+                matches = None
+                if params is BASELINE:
+                    expected[search_type] = output_key(out)
+                elif search_type in expected and not is_approximate(params):
+                    matches = output_key(out) == expected[search_type]
+                results.append({'scenario': name, 'search_type': search_type, 'params': params, **measured, 'matches_baseline': matches})
+                print(f'{name:<20} wall {measured["wall"]:8.3f}s | round trips {measured["round_trips"]:6d} | '
+                      f'peak {measured["peak_memory"] / 2**20:8.2f} MiB | rows {measured["rows_out"]}'
+                      + (' | OUTPUT DIFFERS FROM BASELINE' if matches is False else ''))
+    finally:
+        os.remove(path)
+        os.rmdir(os.path.dirname(path))
+    meta = {'tables': tables, 'columns': columns, 'rows': rows, 'cardinality': cardinality, 'types': list(types), 'latency': latency,
+            'repeat': repeat, 'python': platform.python_version(), 'driver': 'pyodbc' if _HAVE_PYODBC else 'stand-in', 'time': time.time()}
+    return {'meta': meta, 'results': results}
+
+
+#-----------------------------------------------------------------------------------------------------------------------
+#Reports
+#-----------------------------------------------------------------------------------------------------------------------
+def speedup_report(bench):
+    '''
+    optimized configurations against the flags-off baseline of the same search_type (same run)
+    '''
+    baselines = {result['search_type']: result for result in bench['results'] if result['scenario'].endswith('baseline')}
+    lines = ['', 'Against baseline (same code, optimizations off, same run):']
+    for result in bench['results']:
+        base = baselines.get(result['search_type'])
+        if base is None or base is result:
+            continue
+        lines.append(f'  {result["scenario"]:<20} speedup x{base["wall"] / max(result["wall"], 1e-9):.2f} | '
+                     f'round trips {base["round_trips"]} -> {result["round_trips"]} | '
+                     f'peak {base["peak_memory"] / 2**20:.2f} -> {result["peak_memory"] / 2**20:.2f} MiB | '
+                     + {True: 'output matches', False: 'OUTPUT DIFFERS', None: 'output not compared (approximate)'}[result.get('matches_baseline')])
+    return '\n'.join(lines)
+
+def regression_report(previous, current, threshold=0.10):
+    '''
+    compares two result files scenario by scenario
+        -> flags REGRESSION when wall time, round trips or peak memory grew by more than threshold (fraction)
+        -> returns (report text, regression count)
+    '''
+    before = {result['scenario']: result for result in previous['results']}
+    lines = ['', f'Against {time.strftime("%Y-%m-%d %H:%M", time.localtime(previous["meta"]["time"]))} (threshold {threshold:.0%}):']
+    regressions = 0
+    if {key: previous['meta'].get(key) for key in ['tables', 'columns', 'rows', 'cardinality', 'latency']} != \
+       {key: current['meta'].get(key) for key in ['tables', 'columns', 'rows', 'cardinality', 'latency']}:
+        lines.append('  note: schema/latency settings differ between the two runs')
+    for result in current['results']:
+        old = before.get(result['scenario'])
+        if old is None:
+            lines.append(f'  {result["scenario"]:<20} new scenario')
+            continue
+        flags = []
+        for key in ['wall', 'round_trips', 'peak_memory']:
+            if old[key] and (result[key] - old[key]) / old[key] > threshold:
+                flags.append(key)
+        regressions += bool(flags)
+        lines.append(f'  {result["scenario"]:<20} wall {old["wall"]:.3f} -> {result["wall"]:.3f}s | '
+                     f'round trips {old["round_trips"]} -> {result["round_trips"]} | '
+                     f'peak {old["peak_memory"] / 2**20:.2f} -> {result["peak_memory"] / 2**20:.2f} MiB'
+                     + (f' | REGRESSION ({", ".join(flags)})' if flags else ''))
+    return '\n'.join(lines), regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='DbSearcher benchmark on a synthetic local database')
+    parser.add_argument('--tables', type=int, default=20)
+    parser.add_argument('--columns', type=int, default=8)
+    parser.add_argument('--rows', type=int, default=2000)
+    parser.add_argument('--cardinality', type=int, default=100, help='distinct values per column')
+    parser.add_argument('--types', default='INTEGER,TEXT,REAL,DATE', help='column types, cycled across columns')
+    parser.add_argument('--latency', type=float, default=0.001, help='seconds added to every round trip')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--only', default=None, help='comma separated search types to run (Table, Column, Search, MST)')
+    parser.add_argument('--output', default=None, help='write the results to this JSON file')
+    parser.add_argument('--compare', default=None, help='earlier results JSON to report regressions against')
+    parser.add_argument('--threshold', type=float, default=0.10, help='relative growth counted as a regression')
+    args = parser.parse_args(argv)
+
+    scenarios = SCENARIOS if args.only is None else [scenario for scenario in SCENARIOS if scenario[1] in args.only.split(',')]
+    bench = run_bench(args.tables, args.columns, args.rows, args.cardinality, tuple(args.types.split(',')), args.latency, args.repeat, scenarios)
+    print(speedup_report(bench))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(bench, f, indent=2, default=str)
+    regressions = 0
+    if args.compare:
+        with open(args.compare) as f:
+            report, regressions = regression_report(json.load(f), bench, args.threshold)
+        print(report)
+    mismatches = [result['scenario'] for result in bench['results'] if result.get('matches_baseline') is False]
+    if mismatches:
+        print(f'\nOutput differs from baseline: {", ".join(mismatches)}')
+    return 1 if regressions or mismatches else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,16 +1,583 @@
 #IMPORT
 import pyodbc
 import struct
+import re
+import decimal
+import datetime
+import queue
+import threading
+import sqlite3
+import time
+import itertools
+import collections
+import hashlib
+import json
+import os
+import logging
+import math
+import heapq
+import difflib
+import array
+import numpy as np
 import pandas as pd
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, TimeoutError as FuturesTimeout
 
 #message handling
 def display_msg(func):
         def wrapper(*args, **kwargs):
             msg = func(*args, **kwargs)
             if msg != None:
-                print(f'{msg[0]}{" "*(10-len(msg[0]))}-| {msg[1]}')    
+                events = getattr(args[0], 'events', None)
+                if events is not None:
+                    #console (verbose) + message event, see Instrumentation
+                    events.message(msg[0], msg[1])
+                else:
+                    print(f'{msg[0]}{" "*(10-len(msg[0]))}-| {msg[1]}')    
         return wrapper
 
+#SQL LIKE matching
+def like_match(pattern, value):
+    '''
+    case-insensitive SQL LIKE (%% _ and [] classes) evaluated in python
+    '''
+    regex = ''
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == '%':
+            regex += '.*'
+        elif c == '_':
+            regex += '.'
+        elif c == '[' and ']' in pattern[i + 1:]:
+            end = pattern.index(']', i + 1)
+            body = pattern[i + 1:end]
+            regex += '[' + ('^' + re.escape(body[1:]) if body.startswith('^') else re.escape(body)).replace('\\-', '-') + ']'
+            i = end
+        else:
+            regex += re.escape(c)
+        i += 1
+    return re.fullmatch(regex, value, re.IGNORECASE | re.DOTALL) is not None
+
+#Sketches - approximate MST
+class HeavyHitters():
+    '''
+    HeavyHitters - Space-Saving top-k sketch, keeps at most k counters
+        -> every value seen more than n/k times is guaranteed to be kept, counts over-estimate by at most error[value]
+        -> the minimum counter is found through a min-heap with lazy updates, so add is O(1) for kept values and amortized O(log k) otherwise
+    '''
+    
+    def __init__(self, k):
+        self.k : int = k                                    #k
+        self.counts = {}                                    #counts
+        self.errors = {}                                    #errors
+        self.__heap = []                                    #heap ([count, seq, value], count may lag behind counts)
+        self.__seq = itertools.count()                      #seq (tie-break, values are never compared)
+    
+    def add(self, value):
+        if value in self.counts:
+            self.counts[value] += 1
+        elif len(self.counts) < self.k:
+            self.counts[value] = 1
+            self.errors[value] = 0
+            heapq.heappush(self.__heap, (1, next(self.__seq), value))
+        else:
+            #refresh stale heap entries until the top one holds the true minimum
+            count, seq, evicted = self.__heap[0]
+            while self.counts[evicted] != count:
+                heapq.heapreplace(self.__heap, (self.counts[evicted], seq, evicted))
+                count, seq, evicted = self.__heap[0]
+            floor = self.counts.pop(evicted)
+            self.errors.pop(evicted)
+            self.counts[value] = floor + 1
+            self.errors[value] = floor
+            heapq.heapreplace(self.__heap, (floor + 1, next(self.__seq), value))
+    
+    def top(self):
+        '''
+        (value, guaranteed count) pairs, most frequent first
+            -> the guaranteed count is count - error, a lower bound on the true count
+            -> values whose guaranteed count does not exceed their error are dropped (eviction noise, not heavy hitters)
+        '''
+        guaranteed = [(value, count - self.errors[value]) for value, count in self.counts.items() if count - self.errors[value] > self.errors[value]]
+        return sorted(guaranteed, key=lambda pair: pair[1], reverse=True)
+
+class HyperLogLog():
+    '''
+    HyperLogLog - distinct count estimate in 2^precision registers (standard error ~1.04/sqrt(2^precision))
+    '''
+    
+    def __init__(self, precision=12):
+        self.precision : int = precision                    #precision
+        self.registers = bytearray(1 << precision)          #registers
+    
+    def add(self, value):
+        h = int.from_bytes(hashlib.blake2b(value.encode('utf-8', 'surrogatepass'), digest_size=8).digest(), 'big')
+        index = h >> (64 - self.precision)
+        rest = (h << self.precision) & 0xFFFFFFFFFFFFFFFF
+        rank = 64 - self.precision + 1 if rest == 0 else 65 - rest.bit_length()
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+    
+    def count(self):
+        m = len(self.registers)
+        estimate = (0.7213 / (1 + 1.079 / m)) * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            #small range correction (linear counting)
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+#Result Builder
+class ResultBuilder():
+    '''
+    ResultBuilder - column-wise output accumulator (instead of a list of str rows)
+        -> Table / Column / Type style labels are dictionary-encoded into pandas categoricals
+        -> counts and sizes are packed into int64 arrays, values keep their native type (the driver's objects, no per-row copies)
+    '''
+    categorical = ('Database', 'Schema', 'Table', 'Column', 'Type', 'Search Value')
+    integer = ('Count', 'Row Count', 'Display Size', 'Internal Size', 'Values Written', 'Sample Distinct')
+    
+    def __init__(self, columns):
+        self.columns : list = list(columns)                 #columns
+        self.__kinds = ['category' if name in self.categorical else 'int' if name in self.integer else 'object' for name in self.columns]
+        self.__arrays = [array.array('i') if kind == 'category' else array.array('q') if kind == 'int' else [] for kind in self.__kinds]
+        self.__masks = [bytearray() if kind == 'int' else None for kind in self.__kinds]
+        self.__labels = [{} if kind == 'category' else None for kind in self.__kinds]
+        self.__length = 0
+    
+    def __len__(self):
+        return self.__length
+    
+    def append(self, row):
+        for i, value in enumerate(row):
+            kind = self.__kinds[i]
+            if kind == 'category':
+                value = None if value is None else str(value)
+                self.__arrays[i].append(-1 if value is None else self.__labels[i].setdefault(value, len(self.__labels[i])))
+            elif kind == 'int':
+                try:
+                    self.__arrays[i].append(int(value))
+                    self.__masks[i].append(0)
+                except (TypeError, ValueError):
+                    self.__arrays[i].append(0)
+                    self.__masks[i].append(1)
+            else:
+                self.__arrays[i].append(value)
+        self.__length += 1
+    
+    def extend(self, rows):
+        for row in rows:
+            self.append(row)
+        return self
+    
+    def rows(self):
+        '''
+        row view of the collected output -> iterator of tuples in column order
+        '''
+        views = []
+        for kind, values, mask, labels in zip(self.__kinds, self.__arrays, self.__masks, self.__labels):
+            if kind == 'category':
+                views.append(self.__decode(values, list(labels)))
+            elif kind == 'int':
+                views.append(None if missing else value for value, missing in zip(values, mask))
+            else:
+                views.append(values)
+        return zip(*views)
+    
+    @staticmethod
+    def __decode(codes, names):
+        #names is bound per column here (a generator expression in the loop would see the last column's labels)
+        return (None if code < 0 else names[code] for code in codes)
+    
+    def frame(self):
+        '''
+        pd.DataFrame of the collected output (categorical labels, Int64 counts, native values)
+        '''
+        data = {}
+        for name, kind, values, mask, labels in zip(self.columns, self.__kinds, self.__arrays, self.__masks, self.__labels):
+            if kind == 'category':
+                data[name] = pd.Categorical.from_codes(np.frombuffer(values, dtype=np.int32) if values else np.array([], dtype=np.int32), categories=list(labels))
+            elif kind == 'int':
+                integers = np.frombuffer(values, dtype=np.int64) if values else np.array([], dtype=np.int64)
+                if any(mask):
+                    data[name] = pd.arrays.IntegerArray(integers.copy(), np.frombuffer(bytes(mask), dtype=np.bool_).copy())
+                else:
+                    data[name] = integers.copy()
+            else:
+                data[name] = pd.Series(values, dtype=object)
+        return pd.DataFrame(data, columns=self.columns)
+
+#Instrumentation
+class Instrumentation():
+    '''
+    Instrumentation - structured events of a run, fanned out to pluggable sinks
+        events: phase_start / phase_end (phase, elapsed), query (sql, table, column, elapsed, rows), error (error, sql, table, ...),
+                message (level, text - everything display_*_msg prints), summary (slowest tables and queries)
+        sinks: 'logging' or a logging.Logger, a callable receiving each event dict, or a .jsonl file path (one event per line)
+        -> verbose=False silences the console, sinks still receive every event
+        -> query timings are kept for summary() even without sinks
+    '''
+    levels = {'Error': logging.ERROR, 'Log': logging.INFO, 'Info': logging.DEBUG}
+    
+    def __init__(self, verbose=True, sinks=None):
+        self.verbose : bool = verbose                       #verbose
+        self.queries = []                                   #queries [(elapsed, table, column, sql, rows), ...]
+        self.errors : int = 0                               #errors
+        self.__specs = list(sinks or [])                    #sink specs
+        self.__sinks = None                                 #sinks (built on first event)
+        self.__files = []                                   #files (jsonl sinks)
+        self.__lock = threading.Lock()                      #lock
+    
+    def __build_sinks(self):
+        sinks = []
+        for spec in self.__specs:
+            if spec == 'logging' or isinstance(spec, logging.Logger):
+                logger = logging.getLogger('DbSearch') if spec == 'logging' else spec
+                sinks.append(lambda event, logger=logger: logger.log(self.__level(event), json.dumps(event, default=str)))
+            elif isinstance(spec, str) and spec.endswith('.jsonl'):
+                f = open(spec, 'a')
+                self.__files.append(f)
+                sinks.append(lambda event, f=f: f.write(json.dumps(event, default=str) + '\n'))
+            elif callable(spec):
+                sinks.append(spec)
+        return sinks
+    
+    def __level(self, event):
+        if event['event'] == 'error':
+            return logging.ERROR
+        if event['event'] == 'message':
+            return self.levels.get(event['level'], logging.INFO)
+        return logging.DEBUG
+    
+    def emit(self, event, **fields):
+        '''
+        send one event to every sink
+        '''
+        if not self.__specs:
+            return
+        record = {'time': time.time(), 'event': event, **fields}
+        with self.__lock:
+            if self.__sinks is None:
+                self.__sinks = self.__build_sinks()
+            for sink in self.__sinks:
+                sink(record)
+    
+    def message(self, level, text):
+        '''
+        display_*_msg output -> console (verbose) + message event
+        '''
+        if self.verbose:
+            print(f'{level}{" "*(10-len(level))}-| {text}')
+        self.emit('message', level=level, text=text)
+    
+    def error(self, exc, **fields):
+        with self.__lock:
+            self.errors += 1
+        self.emit('error', error=f'{type(exc).__name__}: {exc}', **fields)
+    
+    @contextmanager
+    def phase(self, name):
+        '''
+        with events.phase('tables'): ... -> phase_start / phase_end (elapsed)
+        '''
+        start = time.perf_counter()
+        self.emit('phase_start', phase=name)
+        try:
+            yield
+        finally:
+            self.emit('phase_end', phase=name, elapsed=time.perf_counter() - start)
+    
+    @contextmanager
+    def query(self, sql, table=None, column=None):
+        '''
+        with events.query(sql, table, column) as stats: ... stats['rows'] = n
+            -> query event with elapsed and rows, exceptions become error events and are re-raised
+        '''
+        stats = {'rows': None}
+        start = time.perf_counter()
+        try:
+            yield stats
+        except Exception as e:
+            self.error(e, sql=sql, table=table, column=column)
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            with self.__lock:
+                self.queries.append((elapsed, table, column, sql, stats['rows']))
+            self.emit('query', sql=sql, table=table, column=column, elapsed=elapsed, rows=stats['rows'])
+    
+    def summary(self, top=10):
+        '''
+        slowest tables and queries of the run -> (tables, queries) pd.DataFrames
+            tables: Table, Queries, Elapsed, Rows     queries: Table, Column, SQL, Elapsed, Rows
+        '''
+        with self.__lock:
+            queries = list(self.queries)
+        tables = {}
+        for elapsed, table, column, sql, rows in queries:
+            total = tables.setdefault(table, [table, 0, 0.0, 0])
+            total[1] += 1
+            total[2] += elapsed
+            total[3] += rows or 0
+        tableFrame = pd.DataFrame(sorted(tables.values(), key=lambda total: total[2], reverse=True)[:top], columns=['Table', 'Queries', 'Elapsed', 'Rows'])
+        queryFrame = pd.DataFrame([[table, column, sql, elapsed, rows] for elapsed, table, column, sql, rows in sorted(queries, key=lambda query: query[0], reverse=True)[:top]],
+                                  columns=['Table', 'Column', 'SQL', 'Elapsed', 'Rows'])
+        return tableFrame, queryFrame
+    
+    def finish(self, top=5):
+        '''
+        end of run -> summary event (+ slowest tables on the console), closes file sinks
+        '''
+        if self.queries:
+            tables, queries = self.summary(top)
+            self.emit('summary', queries=len(self.queries), errors=self.errors,
+                      slowest_tables=tables.to_dict('records'), slowest_queries=queries.to_dict('records'))
+            if self.verbose:
+                slowest = ', '.join(f'{row.Table} ({row.Elapsed:.2f}s)' for row in tables.itertuples())
+                self.message("Log", f"{len(self.queries)} queries, {self.errors} errors | slowest tables: {slowest}")
+        self.close()
+    
+    def close(self):
+        with self.__lock:
+            for f in self.__files:
+                f.close()
+            self.__files = []
+            self.__sinks = None
+
+#Connection Pool
+class ConnectionPool():
+    '''
+    ConnectionPool - bounded pool of pyodbc connections shared by the query workers
+        -> connections are opened lazily (up to size) and handed back out LIFO
+    '''
+
+    def __init__(self, connect, size):
+        self.__connect = connect                            #connect (callable returning a connection)
+        self.__size : int = size                            #size
+        self.__idle = queue.LifoQueue()                     #idle
+        self.__opened = []                                  #opened
+        self.__lock = threading.Lock()                      #lock
+
+    def acquire(self):
+        '''
+        grab an idle connection, opening a new one while under the size limit
+        '''
+        try:
+            return self.__idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self.__lock:
+            can_open = len(self.__opened) < self.__size
+            if can_open:
+                cxn = self.__connect()
+                self.__opened.append(cxn)
+        return cxn if can_open else self.__idle.get()
+
+    def release(self, cxn):
+        self.__idle.put(cxn)
+
+    @contextmanager
+    def connection(self):
+        cxn = self.acquire()
+        try:
+            yield cxn
+        finally:
+            self.release(cxn)
+
+    def close(self):
+        '''
+        close every connection the pool opened
+        '''
+        with self.__lock:
+            for cxn in self.__opened:
+                try:
+                    cxn.close()
+                except Exception:
+                    pass
+            self.__opened = []
+
+#MST Index
+class MstIndex():
+    '''
+    MstIndex - persistent inverted index of MST output (value -> table, column, count) in a local SQLite file
+        -> lookup(pattern) supports the same %% and _ wildcards as search_val (case-insensitive)
+        -> repeated value hunts run against the file and never touch the source database
+    '''
+    
+    valueList = ['Table', 'Column', 'Type', 'Value', 'Count']
+    
+    def __init__(self, path):
+        self.path : str = path                              #path
+        self.__cxn = sqlite3.connect(path, check_same_thread=False)
+        self.__cxn.executescript('''
+            CREATE TABLE IF NOT EXISTS postings (value TEXT COLLATE NOCASE, table_name TEXT, column_name TEXT,
+                                                 type_name TEXT, value_count INTEGER);
+            CREATE INDEX IF NOT EXISTS postings_value ON postings (value COLLATE NOCASE);
+            CREATE INDEX IF NOT EXISTS postings_column ON postings (table_name, column_name);
+            CREATE TABLE IF NOT EXISTS fingerprints (table_name TEXT, column_name TEXT, fingerprint TEXT,
+                                                     PRIMARY KEY (table_name, column_name));
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+        ''')
+    
+    def clear(self):
+        '''
+        drop every posting and fingerprint
+        '''
+        self.__cxn.execute('DELETE FROM postings')
+        self.__cxn.execute('DELETE FROM fingerprints')
+    
+    def remove(self, table, column=None):
+        '''
+        drop the postings and fingerprints of a table (or of a single column)
+        '''
+        for name in ['postings', 'fingerprints']:
+            if column is None:
+                self.__cxn.execute(f'DELETE FROM {name} WHERE table_name = ?', (table,))
+            else:
+                self.__cxn.execute(f'DELETE FROM {name} WHERE table_name = ? AND column_name = ?', (table, column))
+    
+    def fingerprints(self):
+        '''
+        stored change fingerprints -> {(table, column): fingerprint}
+        '''
+        rows = self.__cxn.execute('SELECT table_name, column_name, fingerprint FROM fingerprints').fetchall()
+        return {(r[0], r[1]): r[2] for r in rows}
+    
+    def set_fingerprint(self, table, column, fingerprint):
+        self.__cxn.execute('INSERT OR REPLACE INTO fingerprints VALUES (?, ?, ?)', (table, column, fingerprint))
+    
+    def add(self, rows):
+        '''
+        add MST rows -> [Table, Column, Type, Value, Count]
+        '''
+        self.__cxn.executemany('INSERT INTO postings (table_name, column_name, type_name, value, value_count) VALUES (?, ?, ?, ?, ?)',
+                               ([str(r[0]), str(r[1]), str(r[2]), None if r[3] is None else str(r[3]), int(r[4])] for r in rows))
+    
+    def commit(self, db_name=None):
+        '''
+        persist pending changes, stamping the source database and build time
+        '''
+        if db_name is not None:
+            self.__cxn.execute('INSERT OR REPLACE INTO meta VALUES (?, ?)', ('db_name', db_name))
+        self.__cxn.execute('INSERT OR REPLACE INTO meta VALUES (?, ?)', ('built_at', str(time.time())))
+        self.__cxn.commit()
+    
+    def lookup(self, pattern):
+        '''
+        every posting whose value is LIKE pattern
+            -> returns a pd.DataFrame (Table, Column, Type, Value, Count)
+            -> a list of patterns adds a 'Search Value' column, every distinct pattern is an indexed probe (no patterns x postings join):
+                exact patterns in IN lists, wildcard patterns one LIKE each, all read in one transaction
+        '''
+        if not isinstance(pattern, (list, tuple)):
+            rows = self.__cxn.execute('''SELECT table_name, column_name, type_name, value, value_count FROM postings
+                                         WHERE value LIKE ? ORDER BY table_name, column_name, value''', (pattern,)).fetchall()
+            return ResultBuilder(self.valueList).extend(rows).frame()
+        
+        patterns = list(dict.fromkeys(pattern))
+        exact = {}
+        for p in patterns:
+            if not any(c in p for c in '%_'):
+                exact.setdefault(p.lower(), []).append(p)
+        selectSqlString = 'SELECT table_name, column_name, type_name, value, value_count FROM postings'
+        rows = []
+        transaction = not self.__cxn.in_transaction
+        if transaction:
+            self.__cxn.execute('BEGIN')
+        try:
+            keys = list(exact)
+            for i in range(0, len(keys), 500):
+                chunk = [exact[key][0] for key in keys[i:i + 500]]
+                for row in self.__cxn.execute(f'{selectSqlString} WHERE value IN ({", ".join("?" * len(chunk))})', chunk):
+                    rows += [(*row, p) for p in exact.get(str(row[3]).lower(), [])]
+            for p in patterns:
+                if any(c in p for c in '%_'):
+                    rows += [(*row, p) for row in self.__cxn.execute(f'{selectSqlString} WHERE value LIKE ?', (p,))]
+        finally:
+            if transaction:
+                self.__cxn.execute('COMMIT')
+        rows.sort(key=lambda row: (row[0], row[1], str(row[3]), row[5]))
+        return ResultBuilder(self.valueList + ['Search Value']).extend(rows).frame()
+    
+    def to_frame(self):
+        '''
+        the whole index in MST layout
+        '''
+        rows = self.__cxn.execute('SELECT table_name, column_name, type_name, value, value_count FROM postings ORDER BY rowid')
+        return ResultBuilder(self.valueList).extend(rows).frame()
+    
+    def close(self):
+        self.__cxn.close()
+
+#Schema Cache
+class SchemaCache():
+    '''
+    SchemaCache - discovered schema (table list + column metadata) keyed by connection string and db_name
+        -> held in memory for every DbSearcher in the process, optionally persisted to a JSON file
+        -> keys are hashed so connection strings (and their credentials) never reach the disk
+    '''
+    
+    types = {str(t): t for t in [str, bool, int, float, decimal.Decimal, datetime.date, datetime.time, datetime.datetime, bytearray, bytes]}
+    
+    def __init__(self):
+        self.__entries = {}                                 #entries
+        self.__lock = threading.Lock()                      #lock
+    
+    def __key(self, conn_string, db_name):
+        return hashlib.sha256(f'{conn_string}|{db_name}'.encode()).hexdigest()
+    
+    def __load(self, path):
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def get(self, conn_string, db_name, ttl, path=None):
+        '''
+        cached entry younger than ttl seconds -> {'time', 'tables', 'columns'} or None
+        '''
+        key = self.__key(conn_string, db_name)
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is None and path:
+                entry = self.__load(path).get(key)
+                if entry is not None and entry['columns'] is not None:
+                    entry['columns'] = {table: [(c[0], self.types.get(c[1], str), *c[2:]) for c in columns] for table, columns in entry['columns'].items()}
+                    self.__entries[key] = entry
+            if entry is None or time.time() - entry['time'] > ttl:
+                return None
+            return entry
+    
+    def put(self, conn_string, db_name, entry, path=None):
+        '''
+        store (or replace) an entry, writing the JSON file when path is set
+        '''
+        key = self.__key(conn_string, db_name)
+        with self.__lock:
+            self.__entries[key] = entry
+            if path:
+                stored = self.__load(path)
+                stored[key] = {**entry, 'columns': None if entry['columns'] is None else {table: [(c[0], str(c[1]), *c[2:]) for c in columns] for table, columns in entry['columns'].items()}}
+                with open(path, 'w') as f:
+                    json.dump(stored, f)
+    
+    def invalidate(self, conn_string, db_name, path=None):
+        '''
+        drop an entry from memory and from the JSON file
+        '''
+        key = self.__key(conn_string, db_name)
+        with self.__lock:
+            self.__entries.pop(key, None)
+            if path and os.path.exists(path):
+                stored = self.__load(path)
+                if stored.pop(key, None) is not None:
+                    with open(path, 'w') as f:
+                        json.dump(stored, f)
+
+schema_cache = SchemaCache()
+
 #DbSearcher Class
 class DbSearcher():
     '''
@@ -22,9 +589,15 @@ class DbSearcher():
                              Searching on this table is significantly faster)
     '''
     
+    mstColumns = ['TableName', 'ColumnName', 'TypeName', 'Value', 'ValueKey', 'ValueCount']
+    
     def __init__(self, conn_string=None, conn_type=None, db_name=None, search_type=None, 
                  max_row_count=None, data_type=None, min_col_size=None, max_col_size=None, 
-                 table_list=None,column_list=None,search_val=None, and_column=None, like_val=None):
+                 table_list=None,column_list=None,search_val=None, and_column=None, like_val=None,
+                 max_workers=None, query_timeout=None, batch_search=False, typed_search=True,
+                 max_hits=None, time_budget=None, search_order=None, mst_index=None,
+                 mst_refresh=False, mst_table=None, mst_sample=None, mst_top_k=100, mst_output=None, fetch_size=10000, match_cap=None, exact_count=False,
+                 schema_cache_ttl=None, schema_cache_path=None, verbose=True, event_sinks=None):
         
         '''
         Possible inputs
@@ -38,9 +611,29 @@ class DbSearcher():
             max_col_size (default None) - maximum internal size of column 
             table_list (default all tables) - provide a list of tables to limit searches
             column_list (default all columns) - provide a list of columns to limit searches
-            search_val (required for search_type=Search) - string to search. sql special characters work! %% *
+            search_val (required for search_type=Search) - string (or list of strings, searched in a single pass) to search. sql special characters work! %% *
             and_column (optional, default none) - Search including a statement AND column LIKE
             like_val (optional, default none) - paired with and_column            
+            exact_count (default False) - row counts use COUNT(*) per table instead of one catalog query (sys.partitions, etc.)
+            schema_cache_ttl (default None) - opt-in, seconds discovered tables/columns are reused across search() calls (None/0 = every run rediscovers the schema, so DDL is always seen)
+            schema_cache_path (default None) - JSON file the schema cache is persisted to
+            max_workers (default None) - run Search/MST queries concurrently on a pool of this many connections
+            query_timeout (default None) - per-query timeout in seconds (0/None = no timeout)
+            batch_search (default False) - Search checks all eligible columns of a table in a single scan, then samples only the matching columns
+            typed_search (default True) - Search plans predicates by column type (skips impossible columns, typed equality for numbers/dates, no UPPER on case-insensitive collations)
+            max_hits (default None) - Search stops once this many hits are found (pending queries are cancelled, partial results returned)
+            time_budget (default None) - seconds Search may run in total before it stops with partial results (pair with query_timeout to bound running queries)
+            search_order (default None) - None (schema order) or likely (type match, column name similarity to and_column/search_val, small tables first)
+            mst_index (default None) - path of a local SQLite file; MST runs persist their output there for DbSearcher.lookup()
+            mst_refresh (default False) - with mst_index, only re-fetch distinct values of tables/columns whose fingerprint changed
+            mst_table (default None) - table name in db_name; MST materializes the distinct values there (INSERT ... SELECT, indexed) and Search queries it instead of every table
+            mst_sample (default None) - percent of rows sampled per table for an approximate MST (top values with guaranteed lower-bound counts + Sample Distinct, the distinct count of the sample, per column; counts are marked Estimated, TABLESAMPLE counts are scaled, the LIMIT fallback's cover the first rows only and are marked Partial)
+            mst_top_k (default 100) - values kept per column by the approximate MST
+            mst_output (default None) - .csv or .parquet path; MST streams its output there in batches and search() returns a per-column summary
+            fetch_size (default 10000) - rows pulled per fetchmany() batch when streaming (mst_output, DbSearcher.iter_mst(), DbSearcher.iter_matches())
+            match_cap (default None) - most rows DbSearcher.iter_matches() yields in total (None = every matching row)
+            verbose (default True) - print progress/log messages to the console
+            event_sinks (default None) - list of sinks for structured run events: 'logging', a logging.Logger, a callable or a .jsonl file path
         '''
         #------------------------------------------------------------------------
         #USER-CONTROLLED PARAMETERS
@@ -68,6 +661,21 @@ class DbSearcher():
                           "Integer":"<class 'int'>",
                           "String":"<class 'str'>" }
         
+        #ODBC SQL type code -> python type (as pyodbc reports it in cursor.description)
+        self.__sql_types = { -7:bool,
+                             -6:int, 5:int, 4:int, -5:int,
+                             7:float, 6:float, 8:float,
+                             2:decimal.Decimal, 3:decimal.Decimal,
+                             9:datetime.date, 91:datetime.date,
+                             10:datetime.time, 92:datetime.time, -154:datetime.time,
+                             11:datetime.datetime, 93:datetime.datetime,
+                             -2:bytearray, -3:bytearray, -4:bytearray }
+        #ODBC display size of fixed width types (character, decimal, binary and fractional time types are sized in __display_size)
+        self.__display_sizes = { -7:1, -6:4, 5:6, 4:11, -5:20,
+                                 7:14, 6:24, 8:24,
+                                 9:10, 91:10, 10:8, 92:8, -154:8,
+                                 11:19, 93:19, -155:26, -11:36 }
+        
         
         
         self.__min_col_size : int = min_col_size            #min_col_size
@@ -80,6 +688,34 @@ class DbSearcher():
         self.__search_val : str = search_val                #search_val
         self.__and_column : str = and_column                #and_column
         self.__like_val : str = like_val                    #like_val
+        
+        #Performance - Search (Value, MST)
+        self.__exact_count : bool = exact_count             #exact_count
+        self.__schema_cache_ttl : int = schema_cache_ttl    #schema_cache_ttl
+        self.__schema_cache_path : str = schema_cache_path  #schema_cache_path
+        self.__max_workers : int = max_workers              #max_workers
+        self.__query_timeout : int = query_timeout          #query_timeout
+        self.__batch_search : bool = batch_search           #batch_search
+        self.__typed_search : bool = typed_search           #typed_search
+        self.__max_hits : int = max_hits                    #max_hits
+        self.__time_budget : float = time_budget            #time_budget
+        self.__search_order : str = search_order            #search_order
+        
+        #MST Index - MST
+        self.__mst_index : str = mst_index                  #mst_index
+        self.__mst_refresh : bool = mst_refresh             #mst_refresh
+        self.__mst_table : str = mst_table                  #mst_table
+        self.__mst_sample : float = mst_sample              #mst_sample
+        self.__mst_top_k : int = mst_top_k                  #mst_top_k
+        
+        #Streaming - MST
+        self.__mst_output : str = mst_output                #mst_output
+        self.__fetch_size : int = fetch_size                #fetch_size
+        self.__match_cap : int = match_cap                  #match_cap
+        
+        #Instrumentation
+        self.__verbose : bool = verbose                     #verbose
+        self.__event_sinks : list = event_sinks             #event_sinks
 
         self.config = {'conn_string':self.__conn_string,
                        'conn_type':self.__conn_type,
@@ -93,7 +729,27 @@ class DbSearcher():
                        'column_list':self.__column_list, 
                        'search_val':self.__search_val,
                        'and_column':self.__and_column, 
-                       'like_val':self.__like_val}          #config
+                       'like_val':self.__like_val,
+                       'exact_count':self.__exact_count,
+                       'schema_cache_ttl':self.__schema_cache_ttl,
+                       'schema_cache_path':self.__schema_cache_path,
+                       'max_workers':self.__max_workers,
+                       'query_timeout':self.__query_timeout,
+                       'batch_search':self.__batch_search,
+                       'typed_search':self.__typed_search,
+                       'max_hits':self.__max_hits,
+                       'time_budget':self.__time_budget,
+                       'search_order':self.__search_order,
+                       'mst_index':self.__mst_index,
+                       'mst_refresh':self.__mst_refresh,
+                       'mst_table':self.__mst_table,
+                       'mst_sample':self.__mst_sample,
+                       'mst_top_k':self.__mst_top_k,
+                       'mst_output':self.__mst_output,
+                       'fetch_size':self.__fetch_size,
+                       'match_cap':self.__match_cap,
+                       'verbose':self.__verbose,
+                       'event_sinks':self.__event_sinks}    #config
         
         #------------------------------------------------------------------------
         #INTERNAL LOGIC
@@ -103,6 +759,12 @@ class DbSearcher():
         
         self.__is_valid = False                             #is_valid
         self.__cursor = None                                #cursor  
+        self.__cursor_lock = threading.Lock()               #cursor_lock (main cursor shared by workers that could not connect)
+        self.__pool = None                                  #pool (ConnectionPool of the current run, max_workers > 1)
+        self.__schema = None                                #schema (tables + column metadata, see SchemaCache)
+        self.__progress_lock = threading.Lock()             #progress_lock
+        self.__deadline = None                              #deadline (time_budget)
+        self.events = Instrumentation(verbose, None)        #events (see Instrumentation, rebuilt every run)
         
         self.__internal_table_list = []                     #internal_table_list
         self.__internal_table_data = []                     #internal_table_data
@@ -182,9 +844,112 @@ class DbSearcher():
             if self.config['max_col_size'] <= 0:
                 return ['Error', 'Max Column Size must be greater than 0']
         
+        #exact_count
+        if not isinstance(self.config['exact_count'], bool):
+            return ['Error', 'Exact Count must be a Boolean']
+        
+        #schema_cache_ttl
+        if self.config['schema_cache_ttl']:
+            if not isinstance(self.config['schema_cache_ttl'], int) or self.config['schema_cache_ttl'] < 0:
+                return ['Error', 'Schema Cache TTL must be a non-negative Integer (seconds)']
+        
+        #schema_cache_path
+        if self.config['schema_cache_path']:
+            if not isinstance(self.config['schema_cache_path'], str):
+                return ['Error', 'Schema Cache Path must be a File Path String']
+        
+        #max_workers
+        if self.config['max_workers']:
+            if not isinstance(self.config['max_workers'], int):
+                return ['Error', 'Max Workers must be an Integer']
+            if self.config['max_workers'] <= 0:
+                return ['Error', 'Max Workers must be greater than 0']
+        
+        #query_timeout
+        if self.config['query_timeout']:
+            if not isinstance(self.config['query_timeout'], int):
+                return ['Error', 'Query Timeout must be an Integer (seconds)']
+            if self.config['query_timeout'] < 0:
+                return ['Error', 'Query Timeout must not be negative']
+        
+        #batch_search
+        if not isinstance(self.config['batch_search'], bool):
+            return ['Error', 'Batch Search must be a Boolean']
+        
+        #typed_search
+        if not isinstance(self.config['typed_search'], bool):
+            return ['Error', 'Typed Search must be a Boolean']
+        
+        #max_hits
+        if self.config['max_hits']:
+            if not isinstance(self.config['max_hits'], int) or self.config['max_hits'] <= 0:
+                return ['Error', 'Max Hits must be an Integer greater than 0']
+        
+        #time_budget
+        if self.config['time_budget']:
+            if not isinstance(self.config['time_budget'], (int, float)) or self.config['time_budget'] <= 0:
+                return ['Error', 'Time Budget must be a positive Number (seconds)']
+        
+        #search_order
+        if self.config['search_order'] not in [None, 'likely']:
+            return ['Error', 'Search Order must be one of the Options // Options: (None, likely)']
+        
+        #mst_index
+        if self.config['mst_index']:
+            if not isinstance(self.config['mst_index'], str):
+                return ['Error', 'MST Index must be a File Path String']
+        
+        #mst_refresh
+        if self.config['mst_refresh'] and not self.config['mst_index']:
+            return ['Error', 'MST Refresh requires an MST Index (mst_index)']
+        
+        #mst_table
+        if self.config['mst_table']:
+            if not isinstance(self.config['mst_table'], str) or not re.fullmatch(r'\w+', self.config['mst_table']):
+                return ['Error', 'MST Table must be a plain Table Name (letters, digits, _)']
+            if self.config['search_type'] == 'Search':
+                unsupported = [name for name in ['and_column', 'like_val', 'max_row_count', 'min_col_size', 'max_col_size'] if self.config[name] is not None]
+                if unsupported:
+                    return ['Error', f'MST Table Search only filters by table_list, column_list and data_type (unsupported: {", ".join(unsupported)})']
+        
+        #mst_sample
+        if self.config['mst_sample']:
+            if not isinstance(self.config['mst_sample'], (int, float)) or not 0 < self.config['mst_sample'] <= 100:
+                return ['Error', 'MST Sample must be a Percentage (0 < mst_sample <= 100)']
+        
+        #mst_top_k
+        if not isinstance(self.config['mst_top_k'], int) or self.config['mst_top_k'] <= 0:
+            return ['Error', 'MST Top K must be an Integer greater than 0']
+        
+        #mst_output
+        if self.config['mst_output']:
+            if not isinstance(self.config['mst_output'], str) or not self.config['mst_output'].endswith(('.csv', '.parquet')):
+                return ['Error', 'MST Output must be a .csv or .parquet File Path']
+        
+        #fetch_size
+        if not isinstance(self.config['fetch_size'], int) or self.config['fetch_size'] <= 0:
+            return ['Error', 'Fetch Size must be an Integer greater than 0']
+        
+        #verbose
+        if not isinstance(self.config['verbose'], bool):
+            return ['Error', 'Verbose must be a Boolean']
+        
+        #event_sinks
+        if self.config['event_sinks'] is not None:
+            if not isinstance(self.config['event_sinks'], list):
+                return ['Error', 'Event Sinks must be a List']
+            for sink in self.config['event_sinks']:
+                if not (sink == 'logging' or isinstance(sink, logging.Logger) or callable(sink) or (isinstance(sink, str) and sink.endswith('.jsonl'))):
+                    return ['Error', "Event Sinks must be 'logging', a logging.Logger, a callable or a .jsonl File Path"]
+        
+        #match_cap
+        if self.config['match_cap'] is not None:
+            if not isinstance(self.config['match_cap'], int) or self.config['match_cap'] <= 0:
+                return ['Error', 'Match Cap must be an Integer greater than 0']
+        
         #self.__internal_table_list
         if self.config['table_list']:
-            if not isinstance(self.config['self.__internal_table_list'], list):
+            if not isinstance(self.config['table_list'], list):
                 return ['Error', 'Table List Must be a List']
         
         #column_list
@@ -193,6 +958,10 @@ class DbSearcher():
                 return ['Error', 'Column List Must be a List']
         
         #search_val
+        if isinstance(self.config['search_val'], (list, tuple)):
+            if not self.config['search_val'] or not all(isinstance(value, str) for value in self.config['search_val']):
+                return ['Error', 'Search Value list must be a non-empty List of Strings']
+        
 #         if self.config['search_type'] == 'Search':
 #             if not self.config['search_val']:
 #                 return ['Error', 'Search Value must not be empty for this Search Type']
@@ -214,21 +983,30 @@ class DbSearcher():
 #                     return ['Error', 'Both And Column AND Like Value are required (or both None)']    
         
         #Internal Validation = PASS
-        else:
-            self.__is_valid = True
-            return ['Info', 'Internal Validation = PASS']
+        self.__is_valid = True
+        return ['Info', 'Internal Validation = PASS']
                
+    def __connect(self):
+        '''
+        opens an odbc connection with the SQL Server datetimeoffset converter and the query timeout applied
+        '''
+        cxn = pyodbc.connect(self.config["conn_string"])
+        cxn.add_output_converter(-155, self.handle_datetimeoffset)
+        if self.config['query_timeout']:
+            cxn.timeout = self.config['query_timeout']
+        return cxn
+    
     def __test_connection(self):    
         '''
         tests the odbc connection is setup correctly and puts in an output converter for SQL Server datetimeoffsets
         '''    
         try: 
-            cxn = pyodbc.connect(self.config["conn_string"])
-            cxn.add_output_converter(-155, self.handle_datetimeoffset)
+            cxn = self.__connect()
             self.__cursor = cxn.cursor()
             self.display_text_msg(f'Connection Passed with {self.config["conn_string"]}')
             return True
-        except:
+        except Exception as e:
+            self.events.error(e, phase='connection')
             self.display_error_msg(f'Connection Failed with {self.config["conn_string"]}')
             return False
     
@@ -237,90 +1015,206 @@ class DbSearcher():
         initial meta-info grab of all tables in the database
         '''
         try:
-            for table in self.__cursor.tables(schema=f'%{self.__db_name}%'):
-                self.__internal_table_list.append(table.table_name)
+            self.__schema = self.__cached_schema()
+            if self.__schema is None:
+                tableRows = [[table.table_name, table.table_schem, table.table_cat, table.table_type] for table in self.__cursor.tables(schema=f'%{self.config["db_name"]}%')]
+                self.__schema = {'time': time.time(), 'tables': tableRows, 'columns': None}
+                self.__store_schema()
+            else:
+                self.display_text_msg('Schema read from cache')
+            for table in self.__schema['tables']:
+                self.__internal_table_list.append(table[0])
                 if self.config['search_type'] == 'Table':
-                    self.__internal_table_data.append([table.table_name, table.table_schem, table.table_cat, table.table_type])
+                    self.__internal_table_data.append(table)
                 if self.config['and_column'] is not None and self.config['like_val'] is not None:
-                    self.__internal_reference[table.table_name] = []
+                    self.__internal_reference[table[0]] = []
             #self.display_info_msg(f'Table found: {table.table_name}')
             self.display_text_msg(f'Num Tables: {len(self.__internal_table_list)}')
             self.__tableCount = len(self.__internal_table_list)
             return True
-        except:
+        except Exception as e:
+            self.events.error(e, phase='tables')
             self.display_error_msg('Database Unable to be Parsed For Table Info')
             return False
         
+    def __cached_schema(self):
+        '''
+        schema cache entry for this connection/db_name, None when caching is off or the entry expired
+        '''
+        if not self.config['schema_cache_ttl']:
+            return None
+        return schema_cache.get(self.config['conn_string'], self.config['db_name'], self.config['schema_cache_ttl'], self.config['schema_cache_path'])
+    
+    def __store_schema(self):
+        if self.config['schema_cache_ttl']:
+            schema_cache.put(self.config['conn_string'], self.config['db_name'], self.__schema, self.config['schema_cache_path'])
+    
+    def refresh_schema(self):
+        '''
+        forget the cached schema for this connection/db_name, the next search() re-discovers tables and columns
+        '''
+        self.__schema = None
+        schema_cache.invalidate(self.config['conn_string'], self.config['db_name'], self.config['schema_cache_path'])
+    
     def __db_Table(self):
         '''
         *specifically for search_type = Table
         '''        
         if self.config['search_type'] == 'Table':
             valueList=['Database', 'Schema', 'Table', 'Type', 'Row Count', 'SQL']
+            self.__data_array = ResultBuilder(valueList)
+            rowCounts = self.__count_rows([table_info[0] for table_info in self.__internal_table_data])
             for table_info in self.__internal_table_data:
-                self.__parseValue += 1
-                self.display_info_msg(f'Parsing Table {self.__parseValue}/{self.__tableCount} for metadata | ({table_info[0]})')
-                #"point" to specific table for gathering information
-                try:
-                    tableSqlString = f'SELECT COUNT(*) FROM "{self.config["db_name"]}"."{table_info[0]}"'
-                    self.__cursor.execute(tableSqlString)
-                    x = self.__cursor.fetchval()
-                    self.__data_array.append([str(table_info[2]), str(table_info[1]), str(table_info[0]), str(table_info[3]), str(x), str(tableSqlString)])
-               
-                except:
-                    self.display_text_msg(f"Parse Failed for Table {table_info[0]}")
-            self.__df_out = pd.DataFrame(self.__data_array, columns=valueList)
+                if table_info[0] in rowCounts:
+                    x, tableSqlString = rowCounts[table_info[0]]
+                    self.__data_array.append([table_info[2], table_info[1], table_info[0], table_info[3], x, str(tableSqlString)])
+            self.__df_out = self.__data_array.frame()
         
     def __row_Count(self):
         '''
-        grabs row count if max_row_count parameter is updated, for use in filters
+        grabs row count if max_row_count parameter is updated (or search_order = likely), for use in filters and ordering
         '''
         self.__parseValue = 0
-        if self.config['max_row_count'] is not None:
+        if self.config['max_row_count'] is not None or (self.config['search_type'] == 'Search' and self.config['search_order'] == 'likely'):
             if self.config['search_type'] == 'MST' or self.config['search_type'] == 'Search':
-                for table_info in self.__internal_table_list:
-                    self.__parseValue += 1
-                    self.display_info_msg(f'Parsing Table {self.__parseValue}/{self.__tableCount} for Row Count | ({table_info})')
-                    #"point" to specific table for gathering information
-                    try:
-                        tableSqlString = f'SELECT COUNT(*) FROM "{self.__db_name}"."{table_info}"'
-                        self.__cursor.execute(tableSqlString)
-                        x = self.__cursor.fetchval()
-                        self.__table_row_count[table_info] = int(x)
-                    except:
-                        self.display_text_msg(f"Parse Failed for Table {table_info[0]}")
+                tables = [table for table in self.__internal_table_list if self.config['table_list'] is None or table in self.config['table_list']]
+                for table, (x, tableSqlString) in self.__count_rows(tables).items():
+                    self.__table_row_count[table] = int(x)
+    
+    def __catalog_sql(self):
+        '''
+        catalog queries returning (table, row count) for every table of db_name in one round trip
+            -> SQL Server: sys.partitions (heap / clustered index rows)
+            -> OTH: INFORMATION_SCHEMA.TABLES.TABLE_ROWS (MySQL/MariaDB), pg_stat_user_tables (PostgreSQL), ALL_TABLES (Oracle)
+        '''
+        if self.config['conn_type'] == 'SQL':
+            return ['SELECT t.name, SUM(p.rows) FROM sys.tables t '
+                    'JOIN sys.schemas s ON s.schema_id = t.schema_id '
+                    'JOIN sys.partitions p ON p.object_id = t.object_id AND p.index_id IN (0, 1) '
+                    'WHERE s.name = ? GROUP BY t.name']
+        return ["SELECT TABLE_NAME, TABLE_ROWS FROM INFORMATION_SCHEMA.TABLES WHERE TABLE_SCHEMA = ? AND TABLE_TYPE = 'BASE TABLE'",
+                'SELECT relname, n_live_tup FROM pg_stat_user_tables WHERE schemaname = ?',
+                'SELECT TABLE_NAME, NUM_ROWS FROM ALL_TABLES WHERE OWNER = ?']
+    
+    def __count_rows(self, tables):
+        '''
+        row counts for tables -> {table: (row count, sql used)}
+            -> read from the catalog in a single query unless exact_count is set
+            -> tables the catalog does not cover (views, stale/missing statistics) fall back to COUNT(*)
+        '''
+        rowCounts = {}
+        if not self.config['exact_count']:
+            for catalogSqlString in self.__catalog_sql():
+                try:
+                    with self.events.query(catalogSqlString) as stats:
+                        self.__cursor.execute(catalogSqlString, self.config['db_name'])
+                        catalog = {row[0]: row[1] for row in self.__cursor.fetchall() if row[1] is not None}
+                        stats['rows'] = len(catalog)
+                except Exception:
+                    continue
+                if catalog:
+                    self.display_text_msg(f'Row Counts read from catalog ({len(catalog)} tables)')
+                    rowCounts = {table: (int(catalog[table]), catalogSqlString) for table in tables if table in catalog}
+                    break
+        
+        self.__parseValue = 0
+        for table in tables:
+            self.__parseValue += 1
+            if table in rowCounts:
+                continue
+            self.display_info_msg(f'Parsing Table {self.__parseValue}/{self.__tableCount} for Row Count | ({table})')
+            #"point" to specific table for gathering information
+            try:
+                tableSqlString = f'SELECT COUNT(*) FROM "{self.config["db_name"]}"."{table}"'
+                with self.events.query(tableSqlString, table) as stats:
+                    self.__cursor.execute(tableSqlString)
+                    rowCounts[table] = (self.__cursor.fetchval(), tableSqlString)
+                    stats['rows'] = 1
+            except Exception:
+                self.display_text_msg(f"Parse Failed for Table {table}")
+        self.__parseValue = 0
+        return rowCounts
         
     
-    def __sub_run(self):
+    def __pull_columns(self):
         '''
-        The ~magic~
-            -> aka I wrote this a few months ago and the logic is a lot to break down in a short summary
+        column metadata of every table in a single catalog call (cursor.columns)
+            -> {table: [(name, type, display size, internal size, precision, scale, null ok), ...]} shaped like cursor.description
+            -> empty when the driver can't list columns, tables then fall back to a TOP 1 / LIMIT 1 probe
+        '''
+        if self.__schema['columns'] is not None:
+            return self.__schema['columns']
+        columnMeta = {}
+        try:
+            for column in self.__cursor.columns(schema=self.config['db_name']):
+                columnMeta.setdefault(column.table_name, []).append((column.column_name, self.__sql_types.get(column.data_type, str), self.__display_size(column),
+                                                                     column.column_size or 0, column.column_size or 0, column.decimal_digits, bool(column.nullable)))
+            self.display_text_msg(f'Column Metadata read from catalog ({len(columnMeta)} tables)')
+        except Exception as e:
+            self.events.error(e, phase='columns')
+            self.display_text_msg('Column Catalog unavailable, probing tables individually')
+            return {}
+        self.__schema['columns'] = columnMeta
+        self.__store_schema()
+        return columnMeta
+    
+    def __display_size(self, column):
+        '''
+        ODBC display size of a cursor.columns() row (what SQLColAttribute(SQL_DESC_DISPLAY_SIZE) reports for the same column)
+        '''
+        size = column.column_size or 0
+        if column.data_type in (2, 3):
+            return size + 2
+        if column.data_type in (-2, -3, -4):
+            return size * 2
+        if column.data_type in self.__display_sizes:
+            fraction = column.decimal_digits or 0
+            fractional = column.data_type in (10, 92, -154, 11, 93, -155) and fraction > 0
+            return self.__display_sizes[column.data_type] + (fraction + 1 if fractional else 0)
+        return size
+    
+    def __build_queries(self):
+        '''
+        per-table metadata pass, applies the filters and builds the per-column query list
+            -> item: [sqlString, table, column, type, display size, internal size]
         '''
         sqlStringList = []
+        columnMeta = self.__pull_columns()
         for table in self.__internal_table_list:
             self.__parseValue += 1
             
             try:
                 rowval = self.__table_row_count[table]
-            except:
+            except KeyError:
                 rowval = 0
-                
-            self.display_info_msg(f'Parsing Table {self.__parseValue}/{self.__tableCount} for metadata | ({table})')
+            
+            #table level filters prune before any query is sent
+            if self.config['search_type'] == 'Search' or self.config['search_type'] == 'MST':
+                if self.config["table_list"] is not None and table not in self.config["table_list"]:
+                    continue
+                if self.config['max_row_count'] is not None and self.config['max_row_count'] < int(rowval):
+                    continue
             
             try:
-                #"point" to specific table for gathering information
-                if self.config['conn_type'] == 'SQL':
-                    tableSqlString = f'SELECT TOP 1 * FROM "{self.config["db_name"]}"."{table}"'
+                if table in columnMeta:
+                    description = columnMeta[table]
                 else:
-                    tableSqlString = f'SELECT * FROM "{self.config["db_name"]}"."{table}" LIMIT 1'
-                
-                self.__cursor.execute(tableSqlString)
+                    self.display_info_msg(f'Parsing Table {self.__parseValue}/{self.__tableCount} for metadata | ({table})')
+                    #"point" to specific table for gathering information
+                    if self.config['conn_type'] == 'SQL':
+                        tableSqlString = f'SELECT TOP 1 * FROM "{self.config["db_name"]}"."{table}"'
+                    else:
+                        tableSqlString = f'SELECT * FROM "{self.config["db_name"]}"."{table}" LIMIT 1'
+                    
+                    with self.events.query(tableSqlString, table):
+                        self.__cursor.execute(tableSqlString)
+                        description = self.__cursor.description
                 
                 if self.__internal_reference:
-                    for row in self.__cursor.description:
+                    for row in description:
                         self.__internal_reference[table].append(row[0])
                 
-                for row in self.__cursor.description:
+                for row in description:
                     
                     sortSignal = 0
                     #Logic gates for Search Params
@@ -342,19 +1236,18 @@ class DbSearcher():
                                 sortSignal += 1
                     
                     #add sqlString to execute in main run
-                    if sortSignal == 0 and self.config['search_type'] != 'MST':
+                    if sortSignal == 0 and self.config['search_type'] == 'Column':
+                        sqlStringList.append([None, table, row[0], row[1], row[2], row[3]])
+                    
+                    if sortSignal == 0 and self.config['search_type'] == 'Search':
                         #construct SQL statement
-                        if self.config['conn_type'] == 'SQL':
-                            if self.__internal_reference:
-                                sqlString = f'SELECT TOP 1 * FROM {self.config["db_name"]}.{table} WHERE UPPER([{self.config["db_name"]}].[{table}].[{row[0]}]) ' + f"LIKE UPPER('{self.config['search_val']}')" + f"AND [{self.config['db_name']}].[{table}].[{self.config['and_column']}] LIKE '{self.config['like_val']}'"
-                            else:
-                                sqlString = f'SELECT TOP 1 * FROM {self.config["db_name"]}.{table} WHERE UPPER([{self.config["db_name"]}].[{table}].[{row[0]}]) ' + f"LIKE UPPER('{self.config['search_val']}')"
-                        else:
-                            if self.__internal_reference:
-                                sqlString = f'SELECT * FROM {self.config["db_name"]}.{table} WHERE UPPER({self.config["db_name"]}.{table}.{row[0]}) ' + f"LIKE UPPER('{self.config['search_val']}')" + f"AND {self.config['db_name']}.{table}.{self.config['and_column']} LIKE '{self.config['like_val']}' LIMIT 1"
-                            else:
-                                sqlString = f'SELECT * FROM {self.config["db_name"]}.{table} WHERE UPPER({self.config["db_name"]}.{table}.{row[0]}) ' + f"LIKE UPPER('{self.config['search_val']}') LIMIT 1"
-                        sqlStringList.append([sqlString, table, row[0], row[1], row[2], row[3]])        
+                        predicate = self.__search_predicate(table, row[0], row[1])
+                        if predicate is not None and isinstance(self.config['search_val'], (list, tuple)):
+                            sqlString = self.__select_sql(table, self.__sample_projection(table, row[0], row[1]), self.__search_where(table, predicate))
+                        elif predicate is not None:
+                            sqlString = self.__select_sql(table, '*', self.__search_where(table, predicate), top=1)
+                        if predicate is not None:
+                            sqlStringList.append([sqlString, table, row[0], row[1], row[2], row[3]])        
                     
                     if sortSignal == 0 and self.config['search_type'] == 'MST':
                         if self.config['conn_type'] == 'SQL':
@@ -362,51 +1255,1058 @@ class DbSearcher():
                         else:
                             sqlString = f'SELECT {self.config["db_name"]}.{table}.{row[0]}, COUNT({self.config["db_name"]}.{table}.{row[0]}) FROM {self.config["db_name"]}.{table} GROUP BY {self.config["db_name"]}.{table}.{row[0]}'       
                         sqlStringList.append([sqlString, table, row[0], row[1], row[2], row[3]])
-            except:
-                #shows views, etc.
+            except Exception:
+                #shows views, etc. (a failed probe is reported as an error event)
                 self.display_text_msg(f"table {table} not data-related")
-            
+        return sqlStringList
+    
+    def __sub_run(self):
+        '''
+        The ~magic~
+            -> aka I wrote this a few months ago and the logic is a lot to break down in a short summary
+        '''
+        with self.events.phase('metadata'):
+            sqlStringList = self.__build_queries()
+        
         #if meta info        
         if sqlStringList:
             valueList = []
             self.__progressVar = 0
-            totalCount = len(sqlStringList)
-            for item in sqlStringList: #limit for testing
-                self.__progressVar += 1
-                #config settings for searching by value
-                if self.config['search_type'] == 'Search':
-                    if not valueList:
-                        valueList=['Table', 'Column', 'Type', 'Display Size', 'Internal Size', 'SQL', 'Output Sample']
-                    self.display_info_msg(f'Executing Search-Query ({self.__progressVar}/{totalCount}) | {int((self.__progressVar/totalCount) * 100)}%')
-                    try:
-                        self.__cursor.execute(item[0])
-                        x = self.__cursor.fetchone()
-                        if x:
-                            #contructing row to output
-                            self.display_text_msg(str(x))
-                            self.__data_array.append([str(item[1]), str(item[2]), str(item[3]), str(item[4]), str(item[5]), str(item[0]), str(x)])   #CHANGE TO DF OUTPUT
-                    except:
-                        pass  
+            self.__totalCount = len(sqlStringList)
+            #config settings for searching by value
+            if self.config['search_type'] == 'Search':
+                valueList=['Table', 'Column', 'Type', 'Display Size', 'Internal Size', 'SQL', 'Output Sample']
+                multiValue = isinstance(self.config['search_val'], (list, tuple))
+                if multiValue:
+                    valueList.append('Search Value')
+                self.__data_array = ResultBuilder(valueList)
+                if self.config['search_order'] == 'likely':
+                    sqlStringList = self.__likely_order(sqlStringList)
+                hitCount = [0]
+                def stop(result):
+                    #max_hits reached -> no further queries
+                    hitCount[0] += len(result)
+                    return bool(self.config['max_hits']) and hitCount[0] >= self.config['max_hits']
+                if self.config['batch_search']:
+                    batchList = self.__batch_search_list(sqlStringList)
+                    self.__totalCount = len(batchList)
+                    results = self.__run_queries(batchList, self.__batch_search_query, lambda hits: stop([hit for item, itemHits in hits for hit in itemHits]))
+                    hitList = [hit for hits in results for hit in hits]
+                else:
+                    results = self.__run_queries(sqlStringList, self.__search_query, stop)
+                    hitList = zip(sqlStringList, results)
+                if len(results) < self.__totalCount:
+                    reason = 'max_hits' if self.config['max_hits'] and hitCount[0] >= self.config['max_hits'] else 'time_budget'
+                    self.display_text_msg(f'Search stopped early ({reason}) after {len(results)}/{self.__totalCount} queries')
+                for item, hits in hitList:
+                    for searchValue, x in hits:
+                        if self.config['max_hits'] and len(self.__data_array) >= self.config['max_hits']:
+                            break
+                        #contructing row to output
+                        self.display_text_msg(str(x))
+                        self.__data_array.append([item[1], item[2], item[3], item[4], item[5], item[0], str(x)] + ([searchValue] if multiValue else []))
                          
-                #config settings for schema        
-                if self.config['search_type'] == 'Column':
-                    if not valueList:
-                        valueList=['Table', 'Column', 'Type', 'Display Size', 'Internal Size']
-                    self.__data_array.append([str(item[1]), str(item[2]), str(item[3]), str(item[4]), str(item[5])]) #CHANGE TO DF OUTPUT
+            #config settings for schema        
+            if self.config['search_type'] == 'Column':
+                valueList=['Table', 'Column', 'Type', 'Display Size', 'Internal Size']
+                self.__data_array = ResultBuilder(valueList)
+                for item in sqlStringList:
+                    self.__data_array.append(item[1:6])
                     
-                if self.config['search_type'] == 'MST':
-                    if not valueList:
-                        valueList=['Table', 'Column', 'Type', 'Value', 'Count']
-                    self.display_info_msg(f'Executing Distinct Value Fetch | ({self.__progressVar}/{totalCount}) | {int((self.__progressVar/totalCount) * 100)}%')
+            if self.config['search_type'] == 'MST':
+                valueList=['Table', 'Column', 'Type', 'Value', 'Count']
+                self.__data_array = ResultBuilder(valueList)
+                if self.config['mst_table']:
+                    self.__materialize_mst(sqlStringList)
+                    return
+                if self.config['mst_sample']:
+                    self.__approximate_mst(sqlStringList)
+                    return
+                if self.config['mst_index'] and self.config['mst_refresh']:
+                    self.__refresh_index(sqlStringList)
+                    return
+                for item, x in zip(sqlStringList, self.__run_queries(sqlStringList, self.__mst_query)):
+                    for values in x or []:
+                        self.__data_array.append([item[1], item[2], item[3], values[0], values[1]])
+                if self.config['mst_index']:
+                    self.__write_index()
+            self.__df_out = self.__data_array.frame()
+    
+    def __write_index(self):
+        '''
+        replaces the contents of the MST index file with this run's output
+        '''
+        index = MstIndex(self.config['mst_index'])
+        try:
+            index.clear()
+            index.add(self.__data_array.rows())
+            index.commit(self.config['db_name'])
+            self.display_text_msg(f'MST Index written to {self.config["mst_index"]} ({len(self.__data_array)} values)')
+        finally:
+            index.close()
+    
+    def __refresh_index(self, sqlStringList):
+        '''
+        incremental MST refresh against the index (mst_refresh)
+            -> fingerprints every table (row count, column types/sizes and, on SQL Server, a per-column CHECKSUM_AGG)
+            -> re-runs the Distinct Value Fetch only for new or changed columns, drops columns that are gone
+            -> a column whose fetch fails keeps its previous postings and fingerprint, so the next refresh retries it
+            -> the output is the merged index contents
+        '''
+        index = MstIndex(self.config['mst_index'])
+        try:
+            stored = index.fingerprints()
+            
+            tableItems = {}
+            for item in sqlStringList:
+                tableItems.setdefault(item[1], []).append(item)
+            batchList = [[self.__fingerprint_sql(table, items), table, items] for table, items in tableItems.items()]
+            self.__progressVar = 0
+            self.__totalCount = len(batchList)
+            current = {}
+            for fingerprints in self.__run_queries(batchList, self.__fingerprint_query):
+                current.update(fingerprints)
+            
+            changedList = [item for item in sqlStringList if current[(item[1], item[2])] is None or stored.get((item[1], item[2])) != current[(item[1], item[2])]]
+            for table, column in stored:
+                if (table, column) not in current:
+                    index.remove(table, column)
+            self.display_text_msg(f'MST Refresh: {len(changedList)}/{len(sqlStringList)} columns changed')
+            
+            self.__progressVar = 0
+            self.__totalCount = max(len(changedList), 1)
+            for item, x in zip(changedList, self.__run_queries(changedList, self.__mst_query)):
+                if x is None:
+                    self.display_text_msg(f'MST Refresh: fetch failed for {item[1]}.{item[2]}, previous index entries kept')
+                    continue
+                index.remove(item[1], item[2])
+                index.add([item[1], item[2], item[3], values[0], values[1]] for values in x)
+                if current[(item[1], item[2])] is not None:
+                    index.set_fingerprint(item[1], item[2], current[(item[1], item[2])])
+            index.commit(self.config['db_name'])
+            self.__df_out = index.to_frame()
+        finally:
+            index.close()
+    
+    def __fingerprint_sql(self, table, items):
+        '''
+        one query per table returning the row count followed (SQL Server) by a CHECKSUM_AGG per column
+        '''
+        if self.config['conn_type'] == 'SQL':
+            checksums = ''.join(f', CHECKSUM_AGG(CHECKSUM({self.__column_ref(table, item[2])}))' for item in items)
+            return f'SELECT COUNT_BIG(*){checksums} FROM {self.__table_ref(table)}'
+        return f'SELECT COUNT(*) FROM {self.__table_ref(table)}'
+    
+    def __fingerprint_query(self, cursor, batch):
+        '''
+        fingerprints every column of a table -> {(table, column): fingerprint or None if unavailable}
+            -> falls back to a plain row count when the CHECKSUM query is rejected (e.g. text/image columns)
+        '''
+        current, percent = self.__progress()
+        self.display_info_msg(f'Fingerprinting Table ({current}/{self.__totalCount}) | {percent}% | ({batch[1]})')
+        try:
+            with self.events.query(batch[0], batch[1]) as stats:
+                cursor.execute(batch[0])
+                x = cursor.fetchone()
+                stats['rows'] = 1
+        except Exception:
+            try:
+                countSqlString = f'SELECT COUNT(*) FROM {self.__table_ref(batch[1])}'
+                with self.events.query(countSqlString, batch[1]) as stats:
+                    cursor.execute(countSqlString)
+                    x = cursor.fetchone()
+                    stats['rows'] = 1
+            except Exception:
+                x = None
+        fingerprints = {}
+        for i, item in enumerate(batch[2]):
+            if x is None:
+                fingerprints[(item[1], item[2])] = None
+            else:
+                checksum = x[i + 1] if len(x) > i + 1 else ''
+                fingerprints[(item[1], item[2])] = f'{item[3]}|{item[5]}|{x[0]}|{checksum}'
+        return fingerprints
+    
+    def __approximate_mst(self, sqlStringList):
+        '''
+        approximate MST / profiling (mst_sample)
+            -> one sampled scan per table (TABLESAMPLE, or LIMIT when the source has no sampling clause)
+            -> per column: top mst_top_k values (HeavyHitters, guaranteed lower-bound counts) and the distinct count of the sample (HyperLogLog)
+            -> TABLESAMPLE counts are scaled up by 100/mst_sample
+            -> LIMIT reads the first rows, not a random sample -> counts cover those rows only, are not scaled and are marked Partial
+            -> output: Table, Column, Type, Value, Count, Estimated, Partial, Sample Distinct
+        '''
+        tableItems = {}
+        for item in sqlStringList:
+            tableItems.setdefault(item[1], []).append(item)
+        rowCounts = self.__count_rows(list(tableItems)) if self.config['conn_type'] != 'SQL' else {}
+        batchList = []
+        for table, items in tableItems.items():
+            projection = ', '.join(self.__column_ref(table, item[2]) for item in items)
+            if self.config['conn_type'] == 'SQL':
+                sampleSqlStrings = [(f'SELECT {projection} FROM {self.__table_ref(table)} TABLESAMPLE ({self.config["mst_sample"]} PERCENT)', True)]
+            else:
+                sampleSqlStrings = [(f'SELECT {projection} FROM {self.__table_ref(table)} TABLESAMPLE SYSTEM ({self.config["mst_sample"]})', True)]
+                if table in rowCounts:
+                    limit = max(1, math.ceil(rowCounts[table][0] * self.config['mst_sample'] / 100))
+                    sampleSqlStrings.append((f'SELECT {projection} FROM {self.__table_ref(table)} LIMIT {limit}', False))
+            batchList.append([sampleSqlStrings, table, items])
+        
+        self.__progressVar = 0
+        self.__totalCount = len(batchList)
+        self.__data_array = ResultBuilder(['Table', 'Column', 'Type', 'Value', 'Count', 'Estimated', 'Partial', 'Sample Distinct'])
+        for rows in self.__run_queries(batchList, self.__sample_query):
+            self.__data_array.extend(rows)
+        self.__df_out = self.__data_array.frame()
+    
+    def __sample_query(self, cursor, batch):
+        '''
+        runs a table's sample query (first dialect that works) and feeds every column's sketches
+            -> batch[0] is a list of (sql, sampled), counts are only scaled when a sampled (TABLESAMPLE) query ran
+            -> returns MST rows for the table
+        '''
+        current, percent = self.__progress()
+        self.display_info_msg(f'Sampling Table ({current}/{self.__totalCount}) | {percent}% | ({batch[1]})')
+        for sampleSqlString, sampled in batch[0]:
+            try:
+                with self.events.query(sampleSqlString, batch[1]):
+                    cursor.execute(sampleSqlString)
+                break
+            except Exception:
+                continue
+        else:
+            self.display_text_msg(f'Sampling Failed for Table {batch[1]}')
+            return []
+        
+        hitters = [HeavyHitters(self.config['mst_top_k']) for item in batch[2]]
+        distinct = [HyperLogLog() for item in batch[2]]
+        try:
+            rows = cursor.fetchmany(self.config['fetch_size'])
+            while rows:
+                for row in rows:
+                    for i, cell in enumerate(row):
+                        if cell is not None:
+                            hitters[i].add(bytes(cell) if isinstance(cell, bytearray) else cell)
+                            distinct[i].add(str(cell))
+                rows = cursor.fetchmany(self.config['fetch_size'])
+        except Exception as e:
+            self.events.error(e, sql=sampleSqlString, table=batch[1])
+            self.display_text_msg(f'Sampling Interrupted for Table {batch[1]}')
+        
+        if not sampled:
+            self.display_text_msg(f'No Sampling Clause for Table {batch[1]}, first rows read and counts not scaled')
+        scale = 100 / self.config['mst_sample'] if sampled else 1
+        out = []
+        for item, hitter, sketch in zip(batch[2], hitters, distinct):
+            sampleDistinct = sketch.count()
+            for value, count in hitter.top():
+                out.append([item[1], item[2], item[3], value, int(round(count * scale)), True, not sampled, sampleDistinct])
+        return out
+    
+    def __mst_table_ref(self):
+        return self.__table_ref(self.config['mst_table'])
+    
+    def __mst_table_state(self):
+        '''
+        what mst_table currently is in db_name -> 'missing', 'mst' (a table DbSearcher created) or 'foreign' (anything else)
+        '''
+        probeSqlString = f'SELECT * FROM {self.__mst_table_ref()} WHERE 1 = 0'
+        try:
+            self.__cursor.execute(probeSqlString)
+            names = [column[0].lower() for column in self.__cursor.description or []]
+        except Exception:
+            return 'missing'
+        return 'mst' if names == [name.lower() for name in self.mstColumns] else 'foreign'
+    
+    def __materialize_mst(self, sqlStringList):
+        '''
+        server-side MST (mst_table): the distinct values are written to a table inside the source database
+            -> creates the table (only an existing MST layout table is replaced, any other table stops the run), fills it with one INSERT ... SELECT ... GROUP BY per column, committed per table
+            -> ValueKey holds UPPER(Value) and is indexed once loaded, so searches are case-insensitive and sargable
+            -> values are cut to the indexable width (850 chars on SQL Server, 600 otherwise)
+        '''
+        mstRef = self.__mst_table_ref()
+        if self.config['conn_type'] == 'SQL':
+            width, textType = 850, 'NVARCHAR'
+        else:
+            width, textType = 600, 'VARCHAR'
+        dropSqlString = f'DROP TABLE {mstRef}'
+        createSqlString = (f'CREATE TABLE {mstRef} (TableName {textType}(256), ColumnName {textType}(256), TypeName {textType}(64), '
+                           f'Value {textType}({width}), ValueKey {textType}({width}), ValueCount BIGINT)')
+        state = self.__mst_table_state()
+        if state == 'foreign':
+            #never replace a table DbSearcher did not create
+            self.display_error_msg(f'{mstRef} exists and is not an MST Table ({", ".join(self.mstColumns)}), choose another mst_table')
+            return
+        try:
+            if state == 'mst':
+                with self.events.query(dropSqlString, self.config['mst_table']):
+                    self.__cursor.execute(dropSqlString)
+            with self.events.query(createSqlString, self.config['mst_table']):
+                self.__cursor.execute(createSqlString)
+                self.__cursor.commit()
+        except Exception:
+            self.display_error_msg(f'Unable to create MST Table {mstRef}')
+            return
+        
+        tableItems = {}
+        for item in sqlStringList:
+            if item[1] != self.config['mst_table']:
+                tableItems.setdefault(item[1], []).append(item)
+        batchList = []
+        for table, items in tableItems.items():
+            inserts = []
+            for item in items:
+                ref = self.__column_ref(table, item[2])
+                value = f'CAST({ref} AS {textType}({width}))'
+                labels = ', '.join("'" + str(label).replace("'", "''") + "'" for label in [table, item[2], item[3]])
+                inserts.append([f"INSERT INTO {mstRef} (TableName, ColumnName, TypeName, Value, ValueKey, ValueCount) "
+                                f"SELECT {labels}, {value}, UPPER({value}), COUNT({ref}) FROM {self.__table_ref(table)} GROUP BY {ref}", item])
+            batchList.append([None, table, inserts])
+        
+        self.__progressVar = 0
+        self.__totalCount = len(batchList)
+        summary = []
+        for written in self.__run_queries(batchList, self.__materialize_query):
+            summary += written
+        
+        indexName = f'IX_{self.config["mst_table"]}_ValueKey'
+        indexSqlStrings = [f'CREATE INDEX {indexName} ON {mstRef} (ValueKey)']
+        if self.config['conn_type'] != 'SQL':
+            #SQLite qualifies the index rather than the table
+            indexSqlStrings.append(f'CREATE INDEX {self.config["db_name"]}.{indexName} ON {self.config["mst_table"]} (ValueKey)')
+        for indexSqlString in indexSqlStrings:
+            try:
+                with self.events.query(indexSqlString, self.config['mst_table']):
+                    self.__cursor.execute(indexSqlString)
+                    self.__cursor.commit()
+                break
+            except Exception:
+                continue
+        else:
+            self.display_error_msg(f'Unable to index MST Table {mstRef}')
+        self.display_text_msg(f'MST materialized in {mstRef} ({sum(row[3] for row in summary)} values)')
+        self.__df_out = ResultBuilder(['Table', 'Column', 'Type', 'Values Written']).extend(summary).frame()
+    
+    def __materialize_query(self, cursor, batch):
+        '''
+        runs the INSERT ... SELECT ... GROUP BY statements of one table and commits them as a batch
+            -> returns [[table, column, type, rows inserted], ...]
+        '''
+        current, percent = self.__progress()
+        self.display_info_msg(f'Materializing Distinct Values ({current}/{self.__totalCount}) | {percent}% | ({batch[1]})')
+        written = []
+        for insertSqlString, item in batch[2]:
+            try:
+                with self.events.query(insertSqlString, item[1], item[2]) as stats:
+                    cursor.execute(insertSqlString)
+                    stats['rows'] = max(cursor.rowcount, 0)
+                written.append([str(item[1]), str(item[2]), str(item[3]), stats['rows']])
+            except Exception:
+                #reported as an error event, the remaining columns still run
+                continue
+        try:
+            cursor.commit()
+        except Exception as e:
+            self.events.error(e, table=batch[1])
+            return []
+        return written
+    
+    def __search_mst_table(self):
+        '''
+        answers a Search against the materialized MST (mst_table) with one indexed query
+            -> table_list / column_list / data_type filter the MST rows, the other filters are rejected by validation
+            -> returns Table, Column, Type, Value, Count (+ Search Value for a list of search_val)
+        '''
+        values = self.__search_values()
+        multiValue = isinstance(self.config['search_val'], (list, tuple))
+        literals = [value.replace("'", "''") for value in values]
+        equalities = [f"UPPER('{literal}')" for value, literal in zip(values, literals) if multiValue and not any(c in value for c in '%_[')]
+        pieces = [f"ValueKey LIKE UPPER('{literal}')" for value, literal in zip(values, literals) if not multiValue or any(c in value for c in '%_[')]
+        for i in range(0, len(equalities), 1000):
+            pieces.append(f'ValueKey IN ({", ".join(equalities[i:i + 1000])})')
+        where = pieces[0] if len(pieces) == 1 else '(' + ' OR '.join(pieces) + ')'
+        #same table_list / column_list / data_type filters as the per-table Search
+        if self.config['table_list']:
+            where += ' AND TableName IN (' + ', '.join("'" + str(table).replace("'", "''") + "'" for table in self.config['table_list']) + ')'
+        if self.config['column_list']:
+            where += ' AND ColumnName IN (' + ', '.join("'" + str(column).replace("'", "''") + "'" for column in self.config['column_list']) + ')'
+        if self.config['data_type'] is not None:
+            where += " AND TypeName = '" + self.__translate[self.config['data_type']].replace("'", "''") + "'"
+        
+        self.__data_array = ResultBuilder(['Table', 'Column', 'Type', 'Value', 'Count'] + (['Search Value'] if multiValue else []))
+        mstSqlString = f'SELECT TableName, ColumnName, TypeName, Value, ValueCount FROM {self.__mst_table_ref()} WHERE {where}'
+        try:
+            with self.events.query(mstSqlString, self.config['mst_table']) as stats:
+                self.__cursor.execute(mstSqlString)
+                rows = self.__cursor.fetchall()
+                stats['rows'] = len(rows)
+        except Exception:
+            self.display_error_msg(f'Unable to search MST Table {self.__mst_table_ref()}')
+            return
+        for row in rows:
+            if not multiValue:
+                self.__data_array.append(row[:5])
+                continue
+            for value in values:
+                if row[3] is not None and like_match(value, str(row[3])):
+                    self.__data_array.append([*row[:5], value])
+        self.__df_out = self.__data_array.frame()
+    
+    def lookup(self, pattern=None):
+        '''
+        search the MST index (mst_index) instead of the database
+            -> pattern (or list of patterns) defaults to search_val, returns a pd.DataFrame (Table, Column, Type, Value, Count)
+        '''
+        index = MstIndex(self.config['mst_index'])
+        try:
+            return index.lookup(pattern if pattern is not None else self.config['search_val'])
+        finally:
+            index.close()
+    
+    def __column_ref(self, table, column):
+        '''
+        fully qualified column reference for the connection type
+        '''
+        if self.config['conn_type'] == 'SQL':
+            return f'[{self.config["db_name"]}].[{table}].[{column}]'
+        return f'{self.config["db_name"]}.{table}.{column}'
+    
+    def __table_ref(self, table):
+        '''
+        fully qualified table reference for the connection type
+        '''
+        if self.config['conn_type'] == 'SQL':
+            return f'[{self.config["db_name"]}].[{table}]'
+        return f'{self.config["db_name"]}.{table}'
+    
+    def __search_values(self):
+        '''
+        search_val as a list of strings (a single value or a list of values)
+        '''
+        if isinstance(self.config['search_val'], (list, tuple)):
+            return [str(value) for value in self.config['search_val']]
+        return [str(self.config['search_val'])]
+    
+    def __search_predicate(self, table, column, columnType):
+        '''
+        match of a single column against every search_val value
+            -> plain comparisons are folded into IN lists (chunks of 1000), wildcard patterns are OR'ed
+            -> returns None when no value can ever match the column
+        '''
+        values = self.__search_values()
+        equalities = {}
+        predicates = []
+        for value in values:
+            plan = self.__value_predicate(table, column, columnType, value)
+            if plan is None:
+                continue
+            lhs, op, rhs = plan
+            if op == '=' or (op == 'LIKE' and len(values) > 1 and not any(c in value for c in '%_[')):
+                if lhs not in equalities:
+                    equalities[lhs] = []
+                    predicates.append(lhs)
+                equalities[lhs].append(rhs)
+            elif op == 'RAW':
+                predicates.append(f'({rhs})' if len(values) > 1 else rhs)
+            else:
+                predicates.append(f'{lhs} {op} {rhs}')
+        
+        pieces = []
+        for predicate in predicates:
+            if predicate not in equalities:
+                pieces.append(predicate)
+                continue
+            rhsList = list(dict.fromkeys(equalities[predicate]))
+            for i in range(0, len(rhsList), 1000):
+                chunk = rhsList[i:i + 1000]
+                pieces.append(f'{predicate} = {chunk[0]}' if len(chunk) == 1 else f'{predicate} IN ({", ".join(chunk)})')
+        if not pieces:
+            return None
+        return pieces[0] if len(pieces) == 1 else '(' + ' OR '.join(pieces) + ')'
+    
+    def __value_predicate(self, table, column, columnType, value):
+        '''
+        case-insensitive match of a single column against one search value -> (lhs, operator, rhs)
+            -> typed_search plans the predicate from the column type:
+                string  -> LIKE, without the (non-sargable) UPPER wrapping when the collation is already case-insensitive
+                numeric -> typed equality (LIKE only for numeric-looking wildcard patterns)
+                date    -> equality, or a one-day range on datetime columns
+                bit     -> equality for 0/1/true/false, blob -> never
+            -> returns None when the column can never match
+        '''
+        ref = self.__column_ref(table, column)
+        literal = value.replace("'", "''")
+        if not self.config['typed_search']:
+            return (f'UPPER({ref})', 'LIKE', f"UPPER('{literal}')")
+        
+        wildcard = any(c in value for c in '%_[')
+        if columnType is str:
+            if value.upper() == value.lower() or self.__case_insensitive(table, column):
+                return (ref, 'LIKE', f"'{literal}'")
+            return (f'UPPER({ref})', 'LIKE', f"UPPER('{literal}')")
+        if columnType in (bytearray, bytes):
+            return None
+        if columnType is bool:
+            bits = {'0':0, '1':1, 'FALSE':0, 'TRUE':1}
+            return (ref, '=', str(bits[value.upper()])) if value.upper() in bits else None
+        if columnType in (int, float, decimal.Decimal):
+            if wildcard:
+                return (ref, 'LIKE', f"'{literal}'") if set(value) <= set('0123456789.-+%_') else None
+            try:
+                number = decimal.Decimal(value)
+            except decimal.InvalidOperation:
+                return None
+            if not number.is_finite() or (columnType is int and number != number.to_integral_value()):
+                return None
+            return (ref, '=', str(number))
+        if columnType in (datetime.date, datetime.datetime, datetime.time):
+            if wildcard:
+                return (ref, 'LIKE', f"'{literal}'") if set(value) <= set('0123456789-:. T/%_') else None
+            return self.__temporal_predicate(ref, columnType, value)
+        return (f'UPPER({ref})', 'LIKE', f"UPPER('{literal}')")
+    
+    def __temporal_predicate(self, ref, columnType, value):
+        '''
+        typed date/time predicate -> (lhs, operator, rhs), None when value doesn't parse as the column's type
+            -> SQL Server literals use the DATEFORMAT-independent forms (YYYYMMDD, YYYY-MM-DDThh:mm:ss)
+        '''
+        dateFormat = '%Y%m%d' if self.config['conn_type'] == 'SQL' else '%Y-%m-%d'
+        try:
+            if columnType is datetime.time:
+                return (ref, '=', f"'{datetime.time.fromisoformat(value).isoformat()}'")
+            if len(value) <= 10:
+                day = datetime.date.fromisoformat(value)
+                if columnType is datetime.date:
+                    return (ref, '=', f"'{day.strftime(dateFormat)}'")
+                return ('', 'RAW', f"{ref} >= '{day.strftime(dateFormat)}' AND {ref} < '{(day + datetime.timedelta(days=1)).strftime(dateFormat)}'")
+            moment = datetime.datetime.fromisoformat(value)
+            if columnType is datetime.date:
+                return None
+            return (ref, '=', f"'{moment.isoformat(sep='T' if self.config['conn_type'] == 'SQL' else ' ')}'")
+        except ValueError:
+            return None
+    
+    def __case_insensitive(self, table, column):
+        '''
+        True when the column's collation ignores case (SQL Server *_CI_*, MySQL *_ci)
+        '''
+        collation = self.__pull_collations().get(table, {}).get(column)
+        return collation is not None and '_ci' in collation.lower()
+    
+    def __pull_collations(self):
+        '''
+        column collations of db_name from INFORMATION_SCHEMA.COLUMNS in one query -> {table: {column: collation}}
+        '''
+        if self.__schema.get('collations') is not None:
+            return self.__schema['collations']
+        collations = {}
+        collationSqlString = 'SELECT TABLE_NAME, COLUMN_NAME, COLLATION_NAME FROM INFORMATION_SCHEMA.COLUMNS WHERE TABLE_SCHEMA = ? AND COLLATION_NAME IS NOT NULL'
+        try:
+            with self.events.query(collationSqlString) as stats:
+                self.__cursor.execute(collationSqlString, self.config['db_name'])
+                rows = self.__cursor.fetchall()
+                stats['rows'] = len(rows)
+            for row in rows:
+                collations.setdefault(row[0], {})[row[1]] = row[2]
+        except Exception:
+            self.display_text_msg('Column Collations unavailable, searching with UPPER()')
+        self.__schema['collations'] = collations
+        self.__store_schema()
+        return collations
+    
+    def __search_where(self, table, predicate):
+        '''
+        adds the and_column / like_val condition (when set) to a search predicate
+        '''
+        if self.__internal_reference:
+            return f"{predicate} AND {self.__column_ref(table, self.config['and_column'])} LIKE '{self.config['like_val']}'"
+        return predicate
+    
+    def __select_sql(self, table, projection, where, top=None):
+        '''
+        SELECT projection FROM table WHERE where, limited to top rows in the dialect of the connection type
+        '''
+        if self.config['conn_type'] == 'SQL':
+            topString = f'TOP {top} ' if top else ''
+            return f'SELECT {topString}{projection} FROM {self.config["db_name"]}.{table} WHERE {where}'
+        limitString = f' LIMIT {top}' if top else ''
+        return f'SELECT {projection} FROM {self.config["db_name"]}.{table} WHERE {where}{limitString}'
+    
+    def __likely_order(self, sqlStringList):
+        '''
+        search_order = likely -> Search-Queries sorted most promising first
+            -> columns whose type can hold the search value(s) as written
+            -> then column name similarity (difflib) to and_column, or to the search value without wildcards
+            -> then smaller tables (row counts from the catalog)
+        '''
+        values = self.__search_values()
+        targets = [self.config['and_column']] if self.config['and_column'] else [value.strip('%_') for value in values]
+        def likelihood(item):
+            typeMatch = sum(self.__type_match(value, item[3]) for value in values) / len(values)
+            similarity = max(difflib.SequenceMatcher(None, str(item[2]).lower(), target.lower()).ratio() for target in targets)
+            return (-typeMatch, -round(similarity, 1), self.__table_row_count.get(item[1], 0))
+        return sorted(sqlStringList, key=likelihood)
+    
+    def __type_match(self, value, columnType):
+        '''
+        True when the search value reads naturally as a value of columnType (e.g. digits for a numeric column)
+        '''
+        stripped = value.strip('%_')
+        if columnType is str:
+            return not stripped.replace('.', '').replace('-', '').isdigit()
+        if columnType is bool:
+            return stripped.upper() in ['0', '1', 'FALSE', 'TRUE']
+        try:
+            if columnType in (int, float, decimal.Decimal):
+                return decimal.Decimal(stripped).is_finite()
+            if columnType in (datetime.date, datetime.datetime, datetime.time):
+                columnType.fromisoformat(stripped)
+                return True
+        except (ValueError, decimal.InvalidOperation):
+            return False
+        return False
+    
+    def __remaining(self):
+        '''
+        seconds left of the time_budget (None = no budget)
+        '''
+        if self.__deadline is None:
+            return None
+        return max(self.__deadline - time.monotonic(), 0)
+    
+    def __batch_search_list(self, sqlStringList):
+        '''
+        groups the per-column Search-Queries by table into one detection query per table
+            -> the detection query scans the table once and flags (MAX(CASE ...)) every column that matched
+            -> batch item: [detectionSql, table, [per-column items]]
+        '''
+        tableItems = {}
+        for item in sqlStringList:
+            tableItems.setdefault(item[1], []).append(item)
+        
+        batchList = []
+        for table, items in tableItems.items():
+            predicates = [self.__search_predicate(table, item[2], item[3]) for item in items]
+            projection = ', '.join(f'MAX(CASE WHEN {predicate} THEN 1 ELSE 0 END)' for predicate in predicates)
+            where = self.__search_where(table, '(' + ' OR '.join(predicates) + ')')
+            batchList.append([self.__select_sql(table, projection, where), table, items])
+        return batchList
+    
+    def __batch_search_query(self, cursor, batch):
+        '''
+        runs a table's detection query, then pulls the sample row only for the columns that matched
+            -> returns [(item, hits), ...] in column order (see __fetch_hits)
+        '''
+        current, percent = self.__progress()
+        self.display_info_msg(f'Executing Batch Search-Query ({current}/{self.__totalCount}) | {percent}% | ({batch[1]})')
+        try:
+            with self.events.query(batch[0], batch[1]) as stats:
+                cursor.execute(batch[0])
+                flags = cursor.fetchone()
+                stats['rows'] = sum(1 for flag in flags or [] if flag)
+        except Exception:
+            return []
+        hits = []
+        for item, flag in zip(batch[2], flags or []):
+            if flag:
+                try:
+                    with self.events.query(item[0], item[1], item[2]) as stats:
+                        cursor.execute(item[0])
+                        hits.append((item, self.__fetch_hits(cursor, item)))
+                        stats['rows'] = len(hits[-1][1])
+                except Exception:
+                    #reported as an error event, the other flagged columns still run
+                    continue
+        return hits
+    
+    def __progress(self):
+        '''
+        thread-safe progress counter for the query runs
+            -> returns (current, percent)
+        '''
+        with self.__progress_lock:
+            self.__progressVar += 1
+            return self.__progressVar, int((self.__progressVar/self.__totalCount) * 100)
+    
+    def __search_query(self, cursor, item):
+        '''
+        runs a single Search-Query -> hits (see __fetch_hits)
+        '''
+        current, percent = self.__progress()
+        self.display_info_msg(f'Executing Search-Query ({current}/{self.__totalCount}) | {percent}%')
+        try:
+            with self.events.query(item[0], item[1], item[2]) as stats:
+                cursor.execute(item[0])
+                hits = self.__fetch_hits(cursor, item)
+                stats['rows'] = len(hits)
+            return hits
+        except Exception:
+            return []
+    
+    def __fetch_hits(self, cursor, item):
+        '''
+        reads an executed Search-Query -> [(search value, output sample), ...]
+            -> single search_val: the first matching row
+            -> list of search_val: one aggregate row holding a sample value of the column per search value (NULL = no hit)
+        '''
+        if not isinstance(self.config['search_val'], (list, tuple)):
+            x = cursor.fetchone()
+            return [(self.config['search_val'], x)] if x else []
+        
+        row = cursor.fetchone()
+        flags = self.__value_flags(item[1], item[2], item[3])
+        return [(value, sample) for (value, predicate), sample in zip(flags, row or []) if sample is not None]
+    
+    def __value_flags(self, table, column, columnType):
+        '''
+        per search value predicates of one column -> [(value, predicate), ...], values that can never match are left out
+        '''
+        flags = []
+        for value in dict.fromkeys(self.__search_values()):
+            plan = self.__value_predicate(table, column, columnType, value)
+            if plan is not None:
+                flags.append((value, plan[2] if plan[1] == 'RAW' else f'{plan[0]} {plan[1]} {plan[2]}'))
+        return flags
+    
+    def __sample_projection(self, table, column, columnType):
+        '''
+        list of search_val -> MAX(CASE WHEN <value predicate> THEN column END) per value
+            -> a single row comes back (one sample per value) however many rows or distinct values match
+        '''
+        ref = self.__column_ref(table, column)
+        if columnType is bool:
+            #bit columns can't be aggregated on SQL Server
+            ref = f'CAST({ref} AS INT)'
+        return ', '.join(f'MAX(CASE WHEN {predicate} THEN {ref} END)' for value, predicate in self.__value_flags(table, column, columnType))
+    
+    def __value_matches(self, value, cell, columnType):
+        '''
+        python side of __value_predicate, tells which search value a fetched cell matched
+        '''
+        if cell is None:
+            return False
+        if not any(c in value for c in '%_['):
+            try:
+                if columnType is bool:
+                    return {'0':0, '1':1, 'FALSE':0, 'TRUE':1}.get(value.upper()) == int(cell)
+                if columnType in (int, float, decimal.Decimal):
+                    return decimal.Decimal(value) == decimal.Decimal(str(cell))
+                if columnType is datetime.datetime and len(value) <= 10:
+                    return cell.date() == datetime.date.fromisoformat(value)
+                if columnType in (datetime.date, datetime.datetime, datetime.time):
+                    return cell == columnType.fromisoformat(value)
+            except (ValueError, TypeError, AttributeError, decimal.InvalidOperation):
+                return False
+        return like_match(value, str(cell))
+    
+    def __mst_query(self, cursor, item):
+        '''
+        runs a single Distinct Value Fetch, returns all (value, count) rows (None if the fetch failed)
+        '''
+        current, percent = self.__progress()
+        self.display_info_msg(f'Executing Distinct Value Fetch | ({current}/{self.__totalCount}) | {percent}%')
+        try:
+            with self.events.query(item[0], item[1], item[2]) as stats:
+                cursor.execute(item[0])
+                rows = cursor.fetchall() or []
+                stats['rows'] = len(rows)
+            return rows
+        except Exception:
+            return None
+    
+    def __mst_chunks(self, cursor, item):
+        '''
+        streaming Distinct Value Fetch, yields lists of at most fetch_size (value, count) rows
+        '''
+        current, percent = self.__progress()
+        self.display_info_msg(f'Executing Distinct Value Fetch | ({current}/{self.__totalCount}) | {percent}%')
+        try:
+            with self.events.query(item[0], item[1], item[2]) as stats:
+                stats['rows'] = 0
+                cursor.execute(item[0])
+                rows = cursor.fetchmany(self.config['fetch_size'])
+                while rows:
+                    stats['rows'] += len(rows)
+                    yield rows
+                    rows = cursor.fetchmany(self.config['fetch_size'])
+        except Exception:
+            return
+    
+    def __stream_queries(self, sqlStringList, query):
+        '''
+        chunked counterpart of __run_queries, query(cursor, item) is a generator of row chunks
+            -> yields (item, chunk) in sqlStringList order
+            -> at most max_workers queries are in flight, each buffering at most 2 chunks, so memory stays bounded
+        '''
+        workers = self.config['max_workers'] or 1
+        if workers <= 1:
+            for item in sqlStringList:
+                for chunk in query(self.__cursor, item):
+                    yield item, chunk
+            return
+        
+        pool = self.__worker_pool()
+        stop = threading.Event()
+        done = object()
+        def pooled_query(item, chunks):
+            try:
+                try:
+                    cxn = pool.acquire()
+                except Exception as e:
+                    #no connection -> the item yields nothing (streamed chunks cannot wait on the shared main cursor)
+                    self.events.error(e, phase='connection', table=item[1])
+                    return
+                try:
+                    cursor = cxn.cursor()
                     try:
-                        self.__cursor.execute(item[0])
-                        x = self.__cursor.fetchall()
-                        if x is not None:
-                            for values in x:
-                                self.__data_array.append([str(item[1]), str(item[2]), str(item[3]), str(values[0]), str(values[1])]) #CHANGE TO DF OUTPUT
-                    except:
-                        pass
-            self.__df_out = pd.DataFrame(self.__data_array, columns=valueList)
+                        for chunk in query(cursor, item):
+                            if stop.is_set():
+                                break
+                            chunks.put(chunk)
+                    finally:
+                        cursor.close()
+                finally:
+                    pool.release(cxn)
+            finally:
+                chunks.put(done)
+        
+        executor = ThreadPoolExecutor(max_workers=workers)
+        window = collections.deque()
+        pending = iter(sqlStringList)
+        def submit(item):
+            chunks = queue.Queue(maxsize=2)
+            window.append((item, chunks))
+            executor.submit(pooled_query, item, chunks)
+        try:
+            for item in itertools.islice(pending, workers):
+                submit(item)
+            while window:
+                item, chunks = window[0]
+                for chunk in iter(chunks.get, done):
+                    yield item, chunk
+                window.popleft()
+                for item in itertools.islice(pending, 1):
+                    submit(item)
+        finally:
+            #consumer stopped early -> let in-flight workers finish
+            stop.set()
+            for item, chunks in window:
+                while chunks.get() is not done:
+                    pass
+            executor.shutdown(wait=True)
+    
+    def __mst_batches(self):
+        '''
+        streaming MST over the configured tables
+            -> yields pd.DataFrame batches (Table, Column, Type, Value, Count) of at most fetch_size rows
+        '''
+        self.__row_Count()
+        sqlStringList = self.__build_queries()
+        self.__progressVar = 0
+        self.__totalCount = len(sqlStringList)
+        valueList = ['Table', 'Column', 'Type', 'Value', 'Count']
+        for item, chunk in self.__stream_queries(sqlStringList, self.__mst_chunks):
+            yield ResultBuilder(valueList).extend([item[1], item[2], item[3], values[0], values[1]] for values in chunk).frame()
+    
+    def __stream_mst(self):
+        '''
+        writes the streaming MST to mst_output (.csv or .parquet) and, if set, mst_index batch by batch
+            -> returns a per-column summary (Table, Column, Type, Values Written)
+        '''
+        path = self.config['mst_output']
+        writer = None
+        index = MstIndex(self.config['mst_index']) if self.config['mst_index'] else None
+        summary = {}
+        try:
+            if path.endswith('.parquet'):
+                try:
+                    import pyarrow
+                    import pyarrow.parquet
+                except ImportError:
+                    self.display_error_msg('Parquet output requires pyarrow (pip install pyarrow)')
+                    return None
+                #fixed schema - an all-NULL first batch must not decide the Value type, categoricals are written as plain strings
+                schema = pyarrow.schema([('Table', pyarrow.string()), ('Column', pyarrow.string()), ('Type', pyarrow.string()),
+                                         ('Value', pyarrow.large_string()), ('Count', pyarrow.int64())])
+                writer = pyarrow.parquet.ParquetWriter(path, schema)
+            if index is not None:
+                index.clear()
+            
+            first = True
+            for batch in self.__mst_batches():
+                if path.endswith('.parquet'):
+                    #Value mixes native types across columns, parquet needs one type per column
+                    columns = {name: [None if value is None else str(value) for value in batch[name]] for name in ['Table', 'Column', 'Type', 'Value']}
+                    columns['Count'] = batch['Count'].tolist()
+                    writer.write_table(pyarrow.Table.from_pydict(columns, schema=schema))
+                else:
+                    batch.to_csv(path, mode='w' if first else 'a', header=first, index=False)
+                first = False
+                if index is not None:
+                    index.add(batch.itertuples(index=False))
+                for key, count in batch.groupby(['Table', 'Column', 'Type'], sort=False).size().items():
+                    summary[key] = summary.get(key, 0) + int(count)
+            if first and not path.endswith('.parquet'):
+                pd.DataFrame(columns=MstIndex.valueList).to_csv(path, index=False)
+            if index is not None:
+                index.commit(self.config['db_name'])
+        finally:
+            if writer is not None:
+                writer.close()
+            if index is not None:
+                index.close()
+        
+        self.display_text_msg(f'MST written to {path} ({sum(summary.values())} values)')
+        return ResultBuilder(['Table', 'Column', 'Type', 'Values Written']).extend([*key, count] for key, count in summary.items()).frame()
+    
+    def iter_mst(self):
+        '''
+        streaming MST -> generator of pd.DataFrame batches (Table, Column, Type, Value, Count)
+            -> rows are pulled with fetchmany(fetch_size), so peak memory does not grow with the database
+        '''
+        if self.config['search_type'] != 'MST':
+            self.display_error_msg('iter_mst requires search_type = MST')
+            return
+        try:
+            if self.__prepare():
+                yield from self.__mst_batches()
+        finally:
+            self.__close_pool()
+            self.events.finish()
+    
+    def __match_chunks(self, cursor, item):
+        '''
+        streaming full-match fetch, yields (column names, rows) with at most fetch_size rows per chunk
+        '''
+        current, percent = self.__progress()
+        self.display_info_msg(f'Executing Match-Query ({current}/{self.__totalCount}) | {percent}%')
+        try:
+            with self.events.query(item[0], item[1], item[2]) as stats:
+                stats['rows'] = 0
+                cursor.execute(item[0])
+                names = [column[0] for column in cursor.description]
+                rows = cursor.fetchmany(self.config['fetch_size'])
+                while rows:
+                    stats['rows'] += len(rows)
+                    yield names, rows
+                    rows = cursor.fetchmany(self.config['fetch_size'])
+        except Exception:
+            return
+    
+    def __match_batches(self):
+        '''
+        streaming full-match Search over the configured tables
+            -> every matching row (not only TOP 1) of every matching column, at most match_cap rows in total
+            -> yields pd.DataFrame batches: Table, Column (+ Search Value for a list of search_val) followed by the table's own columns
+        '''
+        self.__row_Count()
+        sqlStringList = self.__build_queries()
+        if self.config['search_order'] == 'likely':
+            sqlStringList = self.__likely_order(sqlStringList)
+        matchSqlList = []
+        for item in sqlStringList:
+            where = self.__search_where(item[1], self.__search_predicate(item[1], item[2], item[3]))
+            matchSqlList.append([self.__select_sql(item[1], '*', where, top=self.config['match_cap']), *item[1:]])
+        self.__progressVar = 0
+        self.__totalCount = len(matchSqlList)
+        multiValue = isinstance(self.config['search_val'], (list, tuple))
+        values = self.__search_values()
+        remaining = self.config['match_cap']
+        for item, (names, rows) in self.__stream_queries(matchSqlList, self.__match_chunks):
+            if remaining is not None:
+                rows = rows[:remaining]
+                remaining -= len(rows)
+            batch = pd.DataFrame.from_records([tuple(row) for row in rows], columns=names)
+            if multiValue:
+                position = names.index(item[2]) if item[2] in names else None
+                batch.insert(0, 'Search Value', [next((value for value in values if position is not None and self.__value_matches(value, row[position], item[3])), None) for row in rows])
+            batch.insert(0, 'Column', pd.Categorical([item[2]] * len(rows)))
+            batch.insert(0, 'Table', pd.Categorical([item[1]] * len(rows)))
+            yield batch
+            if remaining == 0:
+                self.display_text_msg(f'Match Cap reached ({self.config["match_cap"]} rows)')
+                return
+    
+    def iter_matches(self):
+        '''
+        streaming full-match Search -> generator of pd.DataFrame batches, one matching column of one table per batch
+            -> rows keep their database types and carry Table / Column provenance (a row matching in two columns is yielded for each)
+            -> rows are pulled with fetchmany(fetch_size) and capped at match_cap, so large result sets can be exported batch by batch
+        '''
+        if self.config['search_type'] != 'Search':
+            self.display_error_msg('iter_matches requires search_type = Search')
+            return
+        try:
+            if self.__prepare():
+                yield from self.__match_batches()
+        finally:
+            self.__close_pool()
+            self.events.finish()
+    
+    def __run_queries(self, sqlStringList, query, stop=None):
+        '''
+        runs query(cursor, item) for every item of sqlStringList
+            -> sequential on the main cursor, or spread over a ConnectionPool when max_workers > 1
+            -> results are returned in sqlStringList order regardless of completion order
+            -> stop(result) returning True, or the time_budget running out, ends the run early:
+                queries not yet started are cancelled and the results so far (a prefix of sqlStringList) are returned
+        '''
+        results = []
+        if not self.config['max_workers'] or self.config['max_workers'] <= 1:
+            for item in sqlStringList:
+                if self.__remaining() == 0:
+                    break
+                results.append(query(self.__cursor, item))
+                if stop is not None and stop(results[-1]):
+                    break
+            return results
+        
+        pool = self.__worker_pool()
+        def pooled_query(item):
+            try:
+                cxn = pool.acquire()
+            except Exception as e:
+                #no connection -> fall back to the main cursor, one worker at a time
+                self.events.error(e, phase='connection')
+                with self.__cursor_lock:
+                    return query(self.__cursor, item)
+            try:
+                cursor = cxn.cursor()
+                try:
+                    return query(cursor, item)
+                finally:
+                    cursor.close()
+            finally:
+                pool.release(cxn)
+        executor = ThreadPoolExecutor(max_workers=self.config['max_workers'])
+        futures = [executor.submit(pooled_query, item) for item in sqlStringList]
+        try:
+            for future in futures:
+                try:
+                    results.append(future.result(timeout=self.__remaining()))
+                except FuturesTimeout:
+                    break
+                if stop is not None and stop(results[-1]):
+                    break
+            return results
+        finally:
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=True)
+    
+    def __worker_pool(self):
+        '''
+        the ConnectionPool of the current run, opened on first use and closed by __close_pool when the run ends
+        '''
+        if self.__pool is None:
+            self.__pool = ConnectionPool(self.__connect, self.config['max_workers'])
+        return self.__pool
+    
+    def __close_pool(self):
+        if self.__pool is not None:
+            self.__pool.close()
+            self.__pool = None
     
     def __clean_internal(self):
         '''
@@ -423,28 +2323,58 @@ class DbSearcher():
         self.__tableCount = 0                               
         self.__parseValue = 0
     
-    def search(self):
+    def __prepare(self):
         '''
-        After configuring paramters, call DbSearcher.search()
-            -> returns a pd.DataFrame object of the output
+        validation, connection and table discovery shared by search() and the streaming generators
         '''
         self.__is_valid = False
+        passConnection = passTable = False
         self.__clean_internal() 
-        self.__internal_validation()
+        self.events.close()
+        self.events = Instrumentation(self.config['verbose'] is not False, self.config['event_sinks'] if isinstance(self.config['event_sinks'], list) else None)
+        with self.events.phase('validation'):
+            self.__internal_validation()
         
         if self.__is_valid:
-            passConnection = self.__test_connection()
+            with self.events.phase('connection'):
+                passConnection = self.__test_connection()
         if passConnection:
-            passTable = self.__pull_tables()
-            
-        if passTable:
-            if self.config['search_type'] == 'Table':
-                self.__db_Table()
-            else:
-                self.__row_Count()
-                self.__sub_run()
-                
-            return self.__df_out
+            with self.events.phase('tables'):
+                passTable = self.__pull_tables()
+        return passTable
+    
+    def search(self):
+        '''
+        After configuring paramters, call DbSearcher.search()
+            -> returns a pd.DataFrame object of the output
+        '''
+        self.__deadline = None
+        if self.config['search_type'] == 'Search' and self.config['time_budget']:
+            self.__deadline = time.monotonic() + self.config['time_budget']
+        try:
+            if self.__prepare():
+                with self.events.phase(self.config['search_type']):
+                    if self.config['search_type'] == 'Table':
+                        self.__db_Table()
+                    elif self.config['search_type'] == 'Search' and self.config['mst_table']:
+                        self.__search_mst_table()
+                    elif self.config['search_type'] == 'MST' and self.config['mst_output'] and not (self.config['mst_refresh'] or self.config['mst_table'] or self.config['mst_sample']):
+                        self.__df_out = self.__stream_mst()
+                    else:
+                        with self.events.phase('row_count'):
+                            self.__row_Count()
+                        self.__sub_run()
+                    
+                return self.__df_out
+        finally:
+            self.__close_pool()
+            self.events.finish()
+    
+    def profile(self, top=10):
+        '''
+        slowest tables and queries of the last run -> (tables, queries) pd.DataFrames (see Instrumentation.summary)
+        '''
+        return self.events.summary(top)
     
     #-------------------------------------------------------------------------------------------------------------------
     #Output Logs
@@ -465,9 +2395,77 @@ class DbSearcher():
         tup = struct.unpack("<6hI2h", dto_value)  # e.g., (2017, 3, 16, 10, 35, 18, 0, -6, 0)
         tweaked = [tup[i] // 100 if i == 6 else tup[i] for i in range(len(tup))]
         return "{:04d}-{:02d}-{:02d} {:02d}:{:02d}:{:02d}.{:07d} {:+03d}:{:02d}".format(*tweaked)
- '''
- ~Example Use~
- dbs = DbSearcher(conn_string="DSN=ExampleDSN", conn_type="OTH", db_name="SampleDatabase")
- dbs.configure("search_type", "Table")
- df = dbs.search()
- '''
+
+#Fan-out Search
+def _source_label(target):
+    '''
+    display name of a fan-out target, connection string credentials (PWD=, Password=) are masked
+    '''
+    if target.get('name'):
+        return str(target['name'])
+    return re.sub(r'(?i)\b(pwd|password)=[^;]*', r'\1=***', str(target.get('conn_string')))
+
+def _search_target(target, params):
+    '''
+    one fan-out target -> (output, report row), never raises so a failing target cannot sink the others
+    '''
+    start = time.perf_counter()
+    kwargs = {**params, **{key: value for key, value in target.items() if key != 'name'}}
+    try:
+        out = DbSearcher(**kwargs).search()
+        if out is None:
+            return None, ['Failed', 'validation or connection failed (see log)', 0, time.perf_counter() - start]
+        if not isinstance(out, pd.DataFrame):
+            #nothing to search (no eligible tables/columns)
+            out = pd.DataFrame()
+        return out, ['OK', None, len(out), time.perf_counter() - start]
+    except Exception as e:
+        return None, ['Failed', f'{type(e).__name__}: {e}', 0, time.perf_counter() - start]
+
+def search_many(targets, target_workers=None, use_processes=False, **params):
+    '''
+    runs the same search against many databases/schemas concurrently
+        targets - list of dicts (conn_string, db_name, optional conn_type / name / any DbSearcher parameter) or (conn_string, db_name) pairs
+        target_workers (default one per target) - targets searched at once
+        use_processes (default False) - ProcessPoolExecutor instead of threads (for CPU-heavy output such as big MSTs)
+        params - DbSearcher parameters shared by every target (search_type, search_val, conn_type, max_workers for each target's own connection pool, ...)
+            -> returns (output, report)
+                output: every target's pd.DataFrame concatenated, prefixed with Source / Source Schema columns
+                report: one row per target (Source, Source Schema, Status, Error, Rows, Elapsed)
+    '''
+    targets = [target if isinstance(target, dict) else {'conn_string': target[0], 'db_name': target[1]} for target in targets]
+    if not targets:
+        return pd.DataFrame(), pd.DataFrame(columns=['Source', 'Source Schema', 'Status', 'Error', 'Rows', 'Elapsed'])
+    executorType = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+    with executorType(max_workers=target_workers or len(targets)) as executor:
+        futures = [executor.submit(_search_target, target, params) for target in targets]
+        outcomes = []
+        for future in futures:
+            try:
+                outcomes.append(future.result())
+            except Exception as e:
+                #worker process died / target not picklable
+                outcomes.append((None, ['Failed', f'{type(e).__name__}: {e}', 0, None]))
+    
+    frames = []
+    report = []
+    for target, (out, row) in zip(targets, outcomes):
+        source = _source_label(target)
+        schema = target.get('db_name', params.get('db_name'))
+        report.append([source, schema, *row])
+        if out is not None and len(out.columns):
+            frames.append(out.assign(**{'Source': source, 'Source Schema': schema})[['Source', 'Source Schema', *out.columns]])
+    report = pd.DataFrame(report, columns=['Source', 'Source Schema', 'Status', 'Error', 'Rows', 'Elapsed'])
+    if not frames:
+        return pd.DataFrame(), report
+    output = pd.concat(frames, ignore_index=True)
+    for name in output.columns:
+        if name in ResultBuilder.categorical or name in ['Source', 'Source Schema']:
+            output[name] = output[name].astype('category')
+    return output, report
+'''
+~Example Use~
+dbs = DbSearcher(conn_string="DSN=ExampleDSN", conn_type="OTH", db_name="SampleDatabase")
+dbs.configure("search_type", "Table")
+df = dbs.search()
+'''
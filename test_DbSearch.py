@@ -0,0 +1,156 @@
+#IMPORT
+import os
+import sqlite3
+
+import pytest
+
+import DbBench
+
+
+#-----------------------------------------------------------------------------------------------------------------------
+#Fixtures (DbBench's SQLite stand-in replaces the ODBC driver)
+#-----------------------------------------------------------------------------------------------------------------------
+@pytest.fixture(scope='module')
+def DbSearch():
+    with DbBench.bench_driver() as module:
+        yield module
+
+@pytest.fixture(scope='module')
+def bench_db(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('bench') / 'bench.db')
+    DbBench.build_database(path, tables=6, columns=4, rows=200, cardinality=20)
+    return path
+
+def searcher(DbSearch, path, **params):
+    DbSearch.schema_cache.invalidate(f'Database={path};Schema=dbo', 'dbo')
+    return DbSearch.DbSearcher(conn_string=f'Database={path};Schema=dbo', conn_type='OTH', db_name='dbo', verbose=False, **params)
+
+def as_text(frame):
+    return sorted(tuple(row) for row in frame.astype(str).itertuples(index=False))
+
+
+#-----------------------------------------------------------------------------------------------------------------------
+#ResultBuilder / MstIndex
+#-----------------------------------------------------------------------------------------------------------------------
+def test_result_builder_round_trip(DbSearch):
+    rows = [('t1', 'c1', 'int', 1, 2), ('t1', 'c2', 'str', 'a', 3), ('t2', None, 'int', None, None)]
+    builder = DbSearch.ResultBuilder(['Table', 'Column', 'Type', 'Value', 'Count']).extend(rows)
+    assert len(builder) == 3
+    assert list(builder.rows()) == rows
+    frame = builder.frame()
+    assert frame['Column'].isna().tolist() == [False, False, True]
+    assert list(frame['Table']) == ['t1', 't1', 't2']
+    assert frame['Count'].tolist()[:2] == [2, 3]
+
+def test_mst_index_round_trip(DbSearch, tmp_path):
+    rows = [('t1', 'c1', 'int', 1, 2), ('t1', 'c2', 'str', 'Alpha', 3), ('t2', 'c1', 'str', 'alphabet', 1)]
+    index = DbSearch.MstIndex(str(tmp_path / 'mst.idx'))
+    try:
+        index.add(DbSearch.ResultBuilder(DbSearch.MstIndex.valueList).extend(rows).rows())
+        index.commit('dbo')
+        assert as_text(index.to_frame()) == sorted(tuple(str(v) for v in row) for row in rows)
+        assert as_text(index.lookup('alpha%')) == [('t1', 'c2', 'str', 'Alpha', '3'), ('t2', 'c1', 'str', 'alphabet', '1')]
+        multi = index.lookup(['alpha', '1'])
+        assert sorted(zip(multi['Table'].astype(str), multi['Search Value'])) == [('t1', '1'), ('t1', 'alpha')]
+    finally:
+        index.close()
+
+def test_mst_index_matches_search_output(DbSearch, bench_db, tmp_path):
+    path = str(tmp_path / 'mst.idx')
+    out = searcher(DbSearch, bench_db, search_type='MST', mst_index=path).search()
+    assert len(out) > 0
+    index = DbSearch.MstIndex(path)
+    try:
+        assert as_text(index.to_frame()) == as_text(out)
+    finally:
+        index.close()
+    os.remove(path)
+
+def test_mst_refresh_keeps_columns_whose_fetch_failed(DbSearch, tmp_path, monkeypatch):
+    bench_db = str(tmp_path / 'bench.db')
+    DbBench.build_database(bench_db, tables=3, columns=4, rows=200, cardinality=20)
+    path = str(tmp_path / 'mst.idx')
+    def refresh():
+        return searcher(DbSearch, bench_db, search_type='MST', mst_index=path, mst_refresh=True).search()
+    before = refresh()
+    kept = before[before['Table'] == 'bench_001']
+    assert len(kept) > 0
+    cxn = sqlite3.connect(bench_db)
+    cxn.execute("INSERT INTO bench_001 (col_01) VALUES ('Refreshed')")
+    cxn.commit()
+    cxn.close()
+
+    execute = DbBench.BenchCursor.execute
+    def failing(self, sql, *params):
+        if 'GROUP BY' in sql and 'bench_001' in sql:
+            raise DbBench.BenchOdbc.OperationalError('query timeout')
+        return execute(self, sql, *params)
+    monkeypatch.setattr(DbBench.BenchCursor, 'execute', failing)
+    failed = refresh()
+    assert as_text(failed[failed['Table'] == 'bench_001']) == as_text(kept)
+
+    monkeypatch.setattr(DbBench.BenchCursor, 'execute', execute)
+    healed = refresh()
+    assert 'Refreshed' in set(healed.loc[healed['Table'] == 'bench_001', 'Value'])
+
+
+#-----------------------------------------------------------------------------------------------------------------------
+#Approximate MST
+#-----------------------------------------------------------------------------------------------------------------------
+def test_heavy_hitters_reports_guaranteed_counts(DbSearch):
+    data = ['hot'] * 3000 + ['warm'] * 900 + [f'id{i}' for i in range(2000)] + ['rare'] * 4
+    hitters = DbSearch.HeavyHitters(5)
+    for value in sorted(data, key=lambda value: hash(value) % 97):
+        hitters.add(value)
+    top = dict(hitters.top())
+    assert 'hot' in top and 0 < top['hot'] <= 3000
+    assert all(value in ('hot', 'warm') for value in top)
+
+def test_sample_fallback_rows_are_partial(DbSearch, bench_db):
+    out = searcher(DbSearch, bench_db, search_type='MST', mst_sample=50, mst_top_k=30).search()
+    assert len(out) > 0
+    assert out['Estimated'].all() and out['Partial'].all()
+    exact = searcher(DbSearch, bench_db, search_type='MST').search()
+    counts = {(str(r[0]), str(r[1]), str(r[3])): r[4] for r in exact.itertuples(index=False)}
+    assert all(r[4] <= counts[(str(r[0]), str(r[1]), str(r[3]))] for r in out.itertuples(index=False))
+
+
+#-----------------------------------------------------------------------------------------------------------------------
+#Metadata
+#-----------------------------------------------------------------------------------------------------------------------
+def test_column_display_size_from_catalog(DbSearch, bench_db):
+    out = searcher(DbSearch, bench_db, search_type='Column').search()
+    assert out['Display Size'].notna().all()
+    sizes = dict(zip(out['Type'].astype(str), out['Display Size']))
+    assert sizes["<class 'int'>"] == 11 and sizes["<class 'str'>"] == 4000 and sizes["<class 'datetime.date'>"] == 10
+
+
+#-----------------------------------------------------------------------------------------------------------------------
+#Fan-out
+#-----------------------------------------------------------------------------------------------------------------------
+def test_search_many_passes_max_workers_to_targets(DbSearch, bench_db, monkeypatch):
+    seen = []
+    searcherType = DbSearch.DbSearcher
+    def recording(**kwargs):
+        seen.append(kwargs.get('max_workers'))
+        return searcherType(**kwargs)
+    monkeypatch.setattr(DbSearch, 'DbSearcher', recording)
+    targets = [{'conn_string': f'Database={bench_db};Schema=dbo', 'db_name': 'dbo', 'name': name} for name in ['a', 'b']]
+    out, report = DbSearch.search_many(targets, target_workers=1, conn_type='OTH', search_type='Table', verbose=False, max_workers=2)
+    assert seen == [2, 2]
+    assert list(report['Rows']) == [6, 6] and len(out) == 12
+
+def test_schema_cache_is_opt_in(DbSearch, tmp_path):
+    bench_db = str(tmp_path / 'bench.db')
+    DbBench.build_database(bench_db, tables=2, columns=2, rows=10)
+    cached = searcher(DbSearch, bench_db, search_type='Table', schema_cache_ttl=300)
+    fresh = searcher(DbSearch, bench_db, search_type='Table')
+    assert len(cached.search()) == 2 and len(fresh.search()) == 2
+    cxn = sqlite3.connect(bench_db)
+    cxn.execute('CREATE TABLE added (x TEXT)')
+    cxn.commit()
+    cxn.close()
+    assert len(fresh.search()) == 3
+    assert len(cached.search()) == 2
+    cached.refresh_schema()
+    assert len(cached.search()) == 3